@@ -1,10 +1,32 @@
+import errno
 import io
+import os
+import random
+import string
 import typing as T
+from pathlib import Path
 
+from tqdm import tqdm
+
+from crcmanip.checkpoint import Checkpoint
 from crcmanip.crc import BaseCRC
+from crcmanip.gf2 import find_affine_subspaces, solve
+from crcmanip.reader import DEFAULT_QUEUE_DEPTH, ChunkReader
 from crcmanip.utils import num_to_bytes, swap_endian, track_progress
 
+if T.TYPE_CHECKING:
+    from crcmanip.index import CRCIndex
+
 DEFAULT_CHUNK_SIZE = 1024 * 1024
+CONSTRAINED_PATCH_SLACK = 2
+CONSTRAINED_PATCH_MAX_ATTEMPTS = 64
+
+CHARSETS = {
+    "printable": bytes(range(0x20, 0x7F)),
+    "alnum": (string.ascii_letters + string.digits).encode(),
+    "hex": (string.digits + "abcdefABCDEF").encode(),
+    "base64": (string.ascii_letters + string.digits + "+/").encode(),
+}
 
 
 class InvalidPositionError(ValueError):
@@ -12,6 +34,16 @@ class InvalidPositionError(ValueError):
         super().__init__("patch position is located outside available input")
 
 
+class UnseekableOutputError(ValueError):
+    def __init__(self) -> None:
+        super().__init__("patching inside a stream needs a seekable output")
+
+
+class UnsolvablePatchError(ValueError):
+    def __init__(self) -> None:
+        super().__init__("no patch satisfies the given constraints")
+
+
 def fix_start_end_pos(
     start_pos: T.Optional[int], end_pos: T.Optional[int], handle: T.IO[bytes]
 ) -> T.Tuple[int, int]:
@@ -31,26 +63,141 @@ def fix_start_end_pos(
     return start_pos, end_pos
 
 
+def get_regions(
+    handle: T.IO[bytes], start_pos: int, end_pos: int
+) -> T.Iterable[T.Tuple[int, int, bool]]:
+    """Split the given range into (start, end, is_hole) regions.
+
+    Holes are detected with SEEK_DATA and SEEK_HOLE where the platform and
+    the file system support them; otherwise the whole range is data.
+    """
+    try:
+        fd = handle.fileno()
+        orig_pos = os.lseek(fd, 0, io.SEEK_CUR)
+        file_size = os.fstat(fd).st_size
+        seek_data, seek_hole = os.SEEK_DATA, os.SEEK_HOLE
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return [(start_pos, end_pos, False)]
+
+    regions: T.List[T.Tuple[int, int, bool]] = []
+    pos = start_pos
+    data_end_pos = min(end_pos, file_size)
+    try:
+        while pos < data_end_pos:
+            try:
+                data_pos = min(os.lseek(fd, pos, seek_data), data_end_pos)
+            except OSError as ex:
+                if ex.errno != errno.ENXIO:
+                    raise
+                data_pos = data_end_pos
+            if data_pos > pos:
+                regions.append((pos, data_pos, True))
+            if data_pos == data_end_pos:
+                break
+            pos = min(os.lseek(fd, data_pos, seek_hole), data_end_pos)
+            regions.append((data_pos, pos, False))
+    except OSError:
+        return [(start_pos, end_pos, False)]
+    finally:
+        # keep the buffered handle in sync with the raw file position
+        os.lseek(fd, orig_pos, io.SEEK_SET)
+
+    # anything past the end of file is left to the regular reads
+    if end_pos > data_end_pos:
+        regions.append((max(start_pos, data_end_pos), end_pos, False))
+    return regions
+
+
+def resume_checkpoint(
+    crc: BaseCRC,
+    checkpoint: T.Optional[Checkpoint],
+    key: str,
+    default_pos: int,
+) -> int:
+    if checkpoint:
+        entry = checkpoint.load(key)
+        if entry:
+            pos, raw_value, consumed = entry
+            crc.reset(raw_value=raw_value, consumed=consumed)
+            return pos
+    return default_pos
+
+
+def split_regions(
+    regions: T.Iterable[T.Tuple[int, int, bool]],
+    chunk_size: int,
+    reverse: bool = False,
+) -> T.Iterator[T.Tuple[int, int, bool]]:
+    """Split regions into (pos, size, is_hole) chunks in reading order.
+
+    Data is split into chunks of at most chunk_size bytes; each hole is
+    returned whole, as it is skipped with a zero shift.
+    """
+    for region_start, region_end, is_hole in (
+        reversed(list(regions)) if reverse else regions
+    ):
+        if is_hole:
+            yield region_start, region_end - region_start, True
+        elif reverse:
+            pos = region_end
+            while pos > region_start:
+                cur_chunk_size = min(chunk_size, pos - region_start)
+                pos -= cur_chunk_size
+                yield pos, cur_chunk_size, False
+        else:
+            pos = region_start
+            while pos < region_end:
+                cur_chunk_size = min(chunk_size, region_end - pos)
+                yield pos, cur_chunk_size, False
+                pos += cur_chunk_size
+
+
 def consume(
     crc: BaseCRC,
     handle: T.IO[bytes],
     start_pos: T.Optional[int] = None,
     end_pos: T.Optional[int] = None,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checkpoint: T.Optional[Checkpoint] = None,
+    read_mode: str = "buffered",
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
 ) -> None:
     start_pos, end_pos = fix_start_end_pos(start_pos, end_pos, handle)
     remaining = end_pos - start_pos
     if not remaining:
         return
 
-    with track_progress(desc="checksum", total=remaining) as progress:
-        handle.seek(start_pos, io.SEEK_SET)
-        while remaining:
-            chunk_size = min(chunk_size, remaining)
-            chunk = handle.read(chunk_size)
-            crc.update(chunk)
-            remaining -= chunk_size
-            progress.update(chunk_size)
+    key = f"checksum:{start_pos}:{end_pos}:{crc.raw_value}:{crc.consumed}"
+    resume_pos = resume_checkpoint(crc, checkpoint, key, start_pos)
+    saved_pos = resume_pos
+
+    regions = get_regions(handle, resume_pos, end_pos)
+    if end_pos - resume_pos <= chunk_size:
+        queue_depth = 0  # nothing to overlap
+
+    with track_progress(
+        desc="checksum", total=remaining
+    ) as progress, ChunkReader(handle, read_mode) as reader:
+        progress.update(resume_pos - start_pos)
+        chunks = reader.read_chunks(
+            (
+                (pos, size)
+                for pos, size, is_hole in split_regions(regions, chunk_size)
+                if not is_hole
+            ),
+            queue_depth,
+        )
+        for pos, size, is_hole in split_regions(regions, chunk_size):
+            if is_hole:
+                crc.update_zeros(size)
+            else:
+                crc.update(next(chunks))
+            pos += size
+            progress.update(size)
+
+            if checkpoint and pos - saved_pos >= checkpoint.interval:
+                checkpoint.save(key, pos, crc.raw_value, crc.consumed)
+                saved_pos = pos
 
 
 def consume_reverse(
@@ -59,29 +206,74 @@ def consume_reverse(
     start_pos: T.Optional[int],
     end_pos: T.Optional[int],
     chunk_size: int = DEFAULT_CHUNK_SIZE,
+    checkpoint: T.Optional[Checkpoint] = None,
+    read_mode: str = "buffered",
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
 ) -> None:
     start_pos, end_pos = fix_start_end_pos(start_pos, end_pos, handle)
     remaining = end_pos - start_pos
     if not remaining:
         return
 
-    with track_progress(desc="checksum 2", total=remaining) as progress:
-        while remaining:
-            chunk_size = min(chunk_size, remaining)
-            handle.seek(start_pos + remaining - chunk_size, io.SEEK_SET)
-            chunk = handle.read(chunk_size)
-            crc.update_reverse(chunk)
-            remaining -= chunk_size
-            progress.update(chunk_size)
+    key = f"checksum 2:{start_pos}:{end_pos}:{crc.raw_value}:{crc.consumed}"
+    resume_pos = resume_checkpoint(crc, checkpoint, key, end_pos)
+    saved_pos = resume_pos
 
+    regions = get_regions(handle, start_pos, resume_pos)
+    if resume_pos - start_pos <= chunk_size:
+        queue_depth = 0  # nothing to overlap
 
-def compute_patch(
+    with track_progress(
+        desc="checksum 2", total=remaining
+    ) as progress, ChunkReader(handle, read_mode) as reader:
+        progress.update(end_pos - resume_pos)
+        # the chunks are announced in reverse, as the kernel only reads
+        # ahead forwards
+        chunks = reader.read_chunks(
+            (
+                (pos, size)
+                for pos, size, is_hole in split_regions(
+                    regions, chunk_size, reverse=True
+                )
+                if not is_hole
+            ),
+            queue_depth,
+        )
+        for pos, size, is_hole in split_regions(
+            regions, chunk_size, reverse=True
+        ):
+            if is_hole:
+                crc.update_zeros_reverse(size)
+            else:
+                crc.update_reverse(next(chunks))
+            progress.update(size)
+
+            if checkpoint and saved_pos - pos >= checkpoint.interval:
+                checkpoint.save(key, pos, crc.raw_value, crc.consumed)
+                saved_pos = pos
+
+
+def get_raw_target_checksum(
+    crc: BaseCRC, target_checksum: int, target_file_size: int
+) -> int:
+    target_checksum ^= crc.final_xor
+    if crc.use_file_size:
+        target_checksum = crc.get_prev_value(
+            num_to_bytes(target_file_size), target_checksum
+        )
+    return target_checksum
+
+
+def compute_patch_states(
     crc: BaseCRC,
     handle: T.IO[bytes],
     target_checksum: int,
     target_pos: int,
+    patch_size: int,
     overwrite: bool,
-) -> int:
+    checkpoint: T.Optional[Checkpoint] = None,
+    index: T.Optional["CRCIndex"] = None,
+) -> T.Tuple[int, int]:
     handle.seek(0, io.SEEK_END)
     orig_file_size = handle.tell()
     if target_pos < 0 or target_pos > orig_file_size:
@@ -89,30 +281,43 @@ def compute_patch(
 
     if overwrite:
         target_file_size = orig_file_size
-        if target_pos + crc.num_bytes > orig_file_size:
-            target_file_size = target_pos + crc.num_bytes
+        if target_pos + patch_size > orig_file_size:
+            target_file_size = target_pos + patch_size
     else:
-        target_file_size = orig_file_size + crc.num_bytes
+        target_file_size = orig_file_size + patch_size
 
-    target_checksum ^= crc.final_xor
-    if crc.use_file_size:
-        target_checksum = crc.get_prev_value(
-            num_to_bytes(target_file_size), target_checksum
-        )
+    target_checksum = get_raw_target_checksum(
+        crc, target_checksum, target_file_size
+    )
 
     pos_start = 0
     pos_before_patch = target_pos
-    pos_after_patch = target_pos + (crc.num_bytes if overwrite else 0)
+    pos_after_patch = target_pos + (patch_size if overwrite else 0)
     pos_end = orig_file_size
 
+    if index is not None and index.file_size == orig_file_size:
+        checksum1 = index.get_next_value(
+            handle, pos_start, pos_before_patch, crc.initial_xor
+        )
+        checksum2 = index.get_prev_value(
+            handle, min(pos_after_patch, pos_end), pos_end, target_checksum
+        )
+        return checksum1, checksum2
+
     crc.reset(raw_value=crc.initial_xor)
-    consume(crc, handle, pos_start, pos_before_patch)
+    consume(crc, handle, pos_start, pos_before_patch, checkpoint=checkpoint)
     checksum1 = crc.raw_value
 
     crc.reset(raw_value=target_checksum)
-    consume_reverse(crc, handle, pos_end, pos_after_patch)
+    consume_reverse(
+        crc, handle, pos_end, pos_after_patch, checkpoint=checkpoint
+    )
     checksum2 = crc.raw_value
 
+    return checksum1, checksum2
+
+
+def solve_patch(crc: BaseCRC, checksum1: int, checksum2: int) -> int:
     if crc.big_endian:
         checksum1 = swap_endian(checksum1, crc.num_bits)
 
@@ -125,6 +330,112 @@ def compute_patch(
     return patch
 
 
+def compute_patch(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    target_checksum: int,
+    target_pos: int,
+    overwrite: bool,
+    checkpoint: T.Optional[Checkpoint] = None,
+    index: T.Optional["CRCIndex"] = None,
+) -> int:
+    checksum1, checksum2 = compute_patch_states(
+        crc,
+        handle,
+        target_checksum,
+        target_pos,
+        crc.num_bytes,
+        overwrite,
+        checkpoint=checkpoint,
+        index=index,
+    )
+    return solve_patch(crc, checksum1, checksum2)
+
+
+def get_constrained_patch_size(crc: BaseCRC, charset: bytes) -> int:
+    subspaces = find_affine_subspaces(charset)
+    num_free_bits = len(subspaces[0][1])
+    if not num_free_bits:
+        raise UnsolvablePatchError
+    return -(-crc.num_bits // num_free_bits) + CONSTRAINED_PATCH_SLACK
+
+
+def solve_constrained_patch(
+    crc: BaseCRC,
+    checksum1: int,
+    checksum2: int,
+    charset: bytes,
+    patch_size: int,
+    max_attempts: int = CONSTRAINED_PATCH_MAX_ATTEMPTS,
+) -> bytes:
+    subspaces = find_affine_subspaces(charset)
+    if not len(subspaces[0][1]):
+        raise UnsolvablePatchError
+
+    # The CRC is affine over GF(2), so restricting every patch byte to an
+    # affine subspace of the charset turns the search into a linear system.
+    rng = random.Random(0)
+    for attempt in range(max_attempts):
+        if attempt:
+            choices = [rng.choice(subspaces) for _i in range(patch_size)]
+        else:
+            choices = [subspaces[0]] * patch_size
+
+        base = bytes(base for base, _basis in choices)
+        vectors: T.List[bytes] = []
+        for num, (_base, basis) in enumerate(choices):
+            for vector in basis:
+                buf = bytearray(patch_size)
+                buf[num] = vector
+                vectors.append(bytes(buf))
+
+        solution = solve(
+            [crc.get_next_value(vector, 0) for vector in vectors],
+            checksum2 ^ crc.get_next_value(base, checksum1),
+        )
+        if solution is None:
+            continue
+
+        patch = bytearray(base)
+        for num, vector in enumerate(vectors):
+            if solution & (1 << num):
+                for i, char in enumerate(vector):
+                    patch[i] ^= char
+        return bytes(patch)
+
+    raise UnsolvablePatchError
+
+
+def compute_constrained_patch(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    target_checksum: int,
+    target_pos: int,
+    overwrite: bool,
+    charset: bytes,
+    patch_size: T.Optional[int] = None,
+    max_attempts: int = CONSTRAINED_PATCH_MAX_ATTEMPTS,
+    checkpoint: T.Optional[Checkpoint] = None,
+    index: T.Optional["CRCIndex"] = None,
+) -> bytes:
+    if patch_size is None:
+        patch_size = get_constrained_patch_size(crc, charset)
+
+    checksum1, checksum2 = compute_patch_states(
+        crc,
+        handle,
+        target_checksum,
+        target_pos,
+        patch_size,
+        overwrite,
+        checkpoint=checkpoint,
+        index=index,
+    )
+    return solve_constrained_patch(
+        crc, checksum1, checksum2, charset, patch_size, max_attempts
+    )
+
+
 def apply_patch(
     crc: BaseCRC,
     target_checksum: int,
@@ -133,15 +444,41 @@ def apply_patch(
     target_pos: int,
     overwrite: bool,
     chunk_size: int = DEFAULT_CHUNK_SIZE,
+    charset: T.Optional[bytes] = None,
+    patch_size: T.Optional[int] = None,
+    checkpoint: T.Optional[Checkpoint] = None,
+    index: T.Optional["CRCIndex"] = None,
 ) -> None:
     input_handle.seek(0, io.SEEK_END)
     end_pos = input_handle.tell()
     if target_pos < 0 or target_pos > end_pos:
         raise InvalidPositionError
 
-    patch = compute_patch(
-        crc, input_handle, target_checksum, target_pos, overwrite=overwrite
-    )
+    if charset is None:
+        patch = num_to_bytes(
+            compute_patch(
+                crc,
+                input_handle,
+                target_checksum,
+                target_pos,
+                overwrite=overwrite,
+                checkpoint=checkpoint,
+                index=index,
+            ),
+            crc.num_bytes,
+        )
+    else:
+        patch = compute_constrained_patch(
+            crc,
+            input_handle,
+            target_checksum,
+            target_pos,
+            overwrite=overwrite,
+            charset=charset,
+            patch_size=patch_size,
+            checkpoint=checkpoint,
+            index=index,
+        )
     input_handle.seek(0, io.SEEK_SET)
     pos = 0
 
@@ -155,9 +492,9 @@ def apply_patch(
             progress.update(cur_chunk_size)
 
         # output patch
-        output_handle.write(num_to_bytes(patch, crc.num_bytes))
+        output_handle.write(patch)
         if overwrite:
-            pos += crc.num_bytes
+            pos += len(patch)
             input_handle.seek(pos, io.SEEK_SET)
 
         # output second half
@@ -167,3 +504,183 @@ def apply_patch(
             output_handle.write(chunk)
             pos += cur_chunk_size
             progress.update(cur_chunk_size)
+
+
+def patch_file(
+    crc: BaseCRC,
+    target_checksum: int,
+    input_path: Path,
+    output_path: T.Optional[Path] = None,
+    backup: bool = False,
+    overwrite: bool = False,
+    target_pos: T.Optional[int] = None,
+    charset: T.Optional[bytes] = None,
+    patch_size: T.Optional[int] = None,
+    checkpoint: T.Optional[Checkpoint] = None,
+    index: T.Optional["CRCIndex"] = None,
+) -> None:
+    """Patch a file, replacing it unless an output path is given.
+
+    Without target_pos the patch goes at the end of the file; negative
+    positions count from the end of the file.
+    """
+    if charset is None:
+        patch_size = crc.num_bytes
+    elif patch_size is None:
+        patch_size = get_constrained_patch_size(crc, charset)
+
+    output_path_provided = output_path is not None
+    if output_path is None:
+        output_path = input_path.with_suffix(input_path.suffix + ".tmp")
+
+    try:
+        with input_path.open("rb") as input_handle, output_path.open(
+            "wb"
+        ) as output_handle:
+            input_handle.seek(0, io.SEEK_END)
+            file_size = input_handle.tell()
+
+            if target_pos is None:
+                target_pos = file_size
+                if overwrite:
+                    target_pos -= patch_size
+                    if target_pos < 0:
+                        target_pos = 0
+            while target_pos < 0:
+                target_pos += file_size
+
+            apply_patch(
+                crc,
+                target_checksum,
+                input_handle,
+                output_handle,
+                target_pos=target_pos,
+                overwrite=overwrite,
+                charset=charset,
+                patch_size=patch_size,
+                checkpoint=checkpoint,
+                index=index,
+            )
+    except BaseException:
+        # do not leave a partial output behind
+        output_path.unlink(missing_ok=True)
+        raise
+
+    if not output_path_provided:
+        if backup:
+            input_path.rename(
+                input_path.with_suffix(input_path.suffix + ".bak")
+            )
+        else:
+            input_path.unlink()
+        output_path.rename(input_path)
+
+
+def consume_stream(
+    crc: BaseCRC,
+    input_handle: T.IO[bytes],
+    output_handle: T.IO[bytes],
+    limit: T.Optional[int],
+    progress: tqdm,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    copied = 0
+    while limit is None or copied < limit:
+        cur_chunk_size = chunk_size
+        if limit is not None:
+            cur_chunk_size = min(chunk_size, limit - copied)
+        chunk = input_handle.read(cur_chunk_size)
+        if not chunk:
+            break
+        output_handle.write(chunk)
+        crc.update(chunk)
+        copied += len(chunk)
+        progress.update(len(chunk))
+    return copied
+
+
+def stream_patch(
+    crc: BaseCRC,
+    target_checksum: int,
+    input_handle: T.IO[bytes],
+    output_handle: T.IO[bytes],
+    target_pos: T.Optional[int] = None,
+    overwrite: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    charset: T.Optional[bytes] = None,
+    patch_size: T.Optional[int] = None,
+) -> None:
+    """Patch a non-seekable input in a single forward pass.
+
+    Without target_pos the patch is appended to the end of the output.
+    Otherwise a placeholder is written at target_pos and filled in once the
+    rest of the input is consumed, which requires a seekable output.
+    """
+    if charset is None:
+        patch_size = crc.num_bytes
+    elif patch_size is None:
+        patch_size = get_constrained_patch_size(crc, charset)
+    if target_pos is not None and target_pos < 0:
+        raise InvalidPositionError
+    if target_pos is not None and not output_handle.seekable():
+        raise UnseekableOutputError
+
+    placeholder_pos: T.Optional[int] = None
+    crc.reset()
+    with track_progress(desc="stream") as progress:
+        if target_pos is None:
+            file_size = consume_stream(
+                crc, input_handle, output_handle, None, progress, chunk_size
+            )
+            checksum1 = crc.raw_value
+            checksum2 = get_raw_target_checksum(
+                crc, target_checksum, file_size + patch_size
+            )
+        else:
+            copied = consume_stream(
+                crc,
+                input_handle,
+                output_handle,
+                target_pos,
+                progress,
+                chunk_size,
+            )
+            if copied < target_pos:
+                raise InvalidPositionError
+            checksum1 = crc.raw_value
+            if overwrite:
+                input_handle.read(patch_size)
+
+            placeholder_pos = output_handle.tell()
+            output_handle.write(bytes(patch_size))
+            zero_checksum2 = crc.get_next_value(bytes(patch_size), checksum1)
+            crc.reset(raw_value=zero_checksum2)
+            suffix_size = consume_stream(
+                crc, input_handle, output_handle, None, progress, chunk_size
+            )
+
+            # The patch affects the final value linearly, shifted by the
+            # suffix length, so the shift can be undone afterwards.
+            final_checksum = get_raw_target_checksum(
+                crc, target_checksum, target_pos + patch_size + suffix_size
+            )
+            checksum2 = zero_checksum2 ^ crc.get_prev_zeros_value(
+                suffix_size, final_checksum ^ crc.raw_value
+            )
+
+    if charset is None:
+        patch = num_to_bytes(
+            solve_patch(crc, checksum1, checksum2), crc.num_bytes
+        )
+    else:
+        patch = solve_constrained_patch(
+            crc, checksum1, checksum2, charset, patch_size
+        )
+
+    if placeholder_pos is None:
+        output_handle.write(patch)
+    else:
+        end_pos = output_handle.tell()
+        output_handle.seek(placeholder_pos, io.SEEK_SET)
+        output_handle.write(patch)
+        output_handle.seek(end_pos, io.SEEK_SET)
@@ -0,0 +1,134 @@
+import bz2
+import gzip
+import lzma
+import tarfile
+import typing as T
+import zipfile
+import zlib
+from pathlib import Path
+
+from crcmanip.algorithm import DEFAULT_CHUNK_SIZE
+from crcmanip.crc import BaseCRC
+from crcmanip.utils import track_progress
+
+
+class InvalidArchiveError(ValueError):
+    def __init__(self) -> None:
+        super().__init__("not a zip or tar archive")
+
+
+class CorruptArchiveError(ValueError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"corrupt archive: {reason}")
+
+
+# errors raised by the standard library while decompressing corrupt data;
+# gzip and bz2 report bad data and checksums as OSError
+DECOMPRESSION_ERRORS = (EOFError, OSError, zlib.error, lzma.LZMAError)
+
+# magic numbers of the compression formats accepted in tar archives
+TAR_COMPRESSIONS: T.Dict[bytes, T.Callable[[T.IO[bytes]], T.IO[bytes]]] = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+
+class ArchiveMember(T.NamedTuple):
+    name: str
+    size: int
+    checksum: T.Optional[int]
+
+
+def consume_member(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    with track_progress(desc="checksum", total=size) as progress:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            crc.update(chunk)
+            progress.update(len(chunk))
+
+
+def checksum_zip_members(
+    crc: BaseCRC, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> T.Iterator[ArchiveMember]:
+    with zipfile.ZipFile(path) as archive:
+        # visit the members in the order they are stored in
+        for info in sorted(
+            archive.infolist(), key=lambda info: info.header_offset
+        ):
+            if info.is_dir():
+                continue
+            crc.reset()
+            try:
+                with archive.open(info) as handle:
+                    consume_member(crc, handle, info.file_size, chunk_size)
+            except (zipfile.BadZipFile, RuntimeError, *DECOMPRESSION_ERRORS):
+                # the data is corrupt, does not match the CRC32 stored in the
+                # archive, or is encrypted
+                yield ArchiveMember(info.filename, info.file_size, None)
+            else:
+                yield ArchiveMember(
+                    info.filename, info.file_size, crc.digest()
+                )
+
+
+def open_tar_stream(handle: T.IO[bytes]) -> T.IO[bytes]:
+    # tarfile's own decompression never checks the trailers of the
+    # compressed streams, so a corrupt archive could pass for a valid one
+    header = handle.read(6)
+    handle.seek(0)
+    for magic, open_stream in TAR_COMPRESSIONS.items():
+        if header.startswith(magic):
+            return open_stream(handle)
+    return handle
+
+
+def checksum_tar_members(
+    crc: BaseCRC, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> T.Iterator[ArchiveMember]:
+    with path.open("rb") as handle:
+        try:
+            with open_tar_stream(handle) as stream, tarfile.open(
+                fileobj=stream, mode="r|"
+            ) as archive:
+                for info in archive:
+                    if not info.isfile():
+                        continue
+                    member_handle = archive.extractfile(info)
+                    assert member_handle is not None
+                    crc.reset()
+                    consume_member(crc, member_handle, info.size, chunk_size)
+                    yield ArchiveMember(info.name, info.size, crc.digest())
+                # read up to the end of the compressed stream so that its
+                # trailer gets verified
+                while stream.read(chunk_size):
+                    pass
+        except (tarfile.TarError, *DECOMPRESSION_ERRORS) as ex:
+            # a tar stream cannot be resumed past the damaged part
+            raise CorruptArchiveError(str(ex) or type(ex).__name__) from ex
+
+
+def checksum_archive(
+    crc: BaseCRC, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> T.Iterator[ArchiveMember]:
+    """Checksum the regular files in a zip or tar archive in one pass.
+
+    Compressed tar archives are decompressed on the fly. Zip members whose
+    data is corrupt, encrypted or does not match the CRC32 stored in the
+    archive are returned without a checksum; a corrupt tar archive raises
+    CorruptArchiveError while iterating. Compressed tar streams are only
+    verified once they are read to the end, so the members returned before
+    the error cannot be trusted either.
+    """
+    if zipfile.is_zipfile(path):
+        return checksum_zip_members(crc, path, chunk_size)
+    if tarfile.is_tarfile(path):
+        return checksum_tar_members(crc, path, chunk_size)
+    raise InvalidArchiveError
@@ -0,0 +1,53 @@
+import importlib
+import typing as T
+from functools import lru_cache
+from types import ModuleType
+
+BACKEND_MODULES = {
+    "fast": "crcmanip.fastcrc",
+    "numpy": "crcmanip.numpycrc",
+    "python": "crcmanip.purecrc",
+}
+
+ACTIVE_BACKEND: T.Optional[str] = None
+
+
+class UnavailableBackendError(ValueError):
+    def __init__(self, name: str) -> None:
+        super().__init__(f"CRC backend is not available: {name}")
+
+
+@lru_cache
+def load_backend(name: str) -> T.Optional[ModuleType]:
+    try:
+        return importlib.import_module(BACKEND_MODULES[name])
+    except ImportError:
+        return None
+
+
+def get_available_backends() -> T.List[str]:
+    return [name for name in BACKEND_MODULES if load_backend(name)]
+
+
+def set_backend(name: str) -> None:
+    global ACTIVE_BACKEND
+    if name not in BACKEND_MODULES or not load_backend(name):
+        raise UnavailableBackendError(name)
+    ACTIVE_BACKEND = name
+
+
+def get_backend_name() -> str:
+    global ACTIVE_BACKEND
+    if ACTIVE_BACKEND is None:
+        # only load the engines until one is found, as NumPy is slow to
+        # import
+        ACTIVE_BACKEND = next(
+            name for name in BACKEND_MODULES if load_backend(name)
+        )
+    return ACTIVE_BACKEND
+
+
+def get_backend() -> ModuleType:
+    backend = load_backend(get_backend_name())
+    assert backend
+    return backend
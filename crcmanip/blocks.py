@@ -0,0 +1,68 @@
+import io
+import typing as T
+
+from crcmanip.algorithm import DEFAULT_CHUNK_SIZE
+from crcmanip.crc import BaseCRC
+from crcmanip.gf2 import multiply
+from crcmanip.reader import DEFAULT_QUEUE_DEPTH, ChunkReader
+from crcmanip.utils import track_progress
+
+BLOCK_FORMATS = ["json", "binary"]
+
+
+def checksum_blocks(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    block_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    read_mode: str = "buffered",
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+) -> T.List[int]:
+    """Return the checksum of every block, leaving crc at the whole file.
+
+    Each byte is hashed once, into the state of its block. The state of
+    the file is then derived from the block states: hashing a block from
+    any state equals hashing it from the initial value, plus the zero
+    shift of the difference between the two.
+    """
+    assert block_size > 0
+    handle.seek(0, io.SEEK_END)
+    file_size = handle.tell()
+    chunk_size = max(block_size, chunk_size - chunk_size % block_size)
+
+    block_crc = crc.copy()
+    shift_operator = [
+        crc.get_next_zeros_value(block_size, 1 << bit)
+        for bit in range(crc.num_bits)
+    ]
+    raw_value = crc.initial_xor
+    checksums: T.List[int] = []
+
+    with track_progress(
+        desc="checksum", total=file_size
+    ) as progress, ChunkReader(handle, read_mode) as reader:
+        chunks = reader.read_chunks(
+            (
+                (pos, min(chunk_size, file_size - pos))
+                for pos in range(0, file_size, chunk_size)
+            ),
+            queue_depth,
+        )
+        for chunk in chunks:
+            for pos in range(0, len(chunk), block_size):
+                block = chunk[pos : pos + block_size]
+                block_crc.reset().update(block)
+                checksums.append(block_crc.digest())
+
+                difference = raw_value ^ crc.initial_xor
+                if len(block) == block_size:
+                    difference = multiply(shift_operator, difference)
+                else:
+                    difference = crc.get_next_zeros_value(
+                        len(block), difference
+                    )
+                raw_value = block_crc.raw_value ^ difference
+            progress.update(len(chunk))
+
+    crc.reset(raw_value=raw_value, consumed=file_size)
+    return checksums
@@ -0,0 +1,75 @@
+import json
+import os
+import typing as T
+from pathlib import Path
+
+DEFAULT_CHECKPOINT_INTERVAL = 256 * 1024 * 1024
+
+
+class Checkpoint:
+    """Hashing progress persisted to a file, to resume interrupted jobs.
+
+    Each entry stores the position reached along with the CRC state at
+    that point. Entries are discarded if the identity (for example the
+    size and modification time of the hashed file) changes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        identity: T.Dict[str, T.Any],
+        interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.identity = identity
+        self.interval = interval
+        self.entries: T.Dict[str, T.Dict[str, int]] = {}
+
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("identity") == identity:
+            self.entries = data.get("entries", {})
+
+    def load(self, key: str) -> T.Optional[T.Tuple[int, int, int]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry["offset"], entry["raw_value"], entry["consumed"]
+
+    def save(
+        self, key: str, offset: int, raw_value: int, consumed: int
+    ) -> None:
+        self.entries[key] = {
+            "offset": offset,
+            "raw_value": raw_value,
+            "consumed": consumed,
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"identity": self.identity, "entries": self.entries})
+        )
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        self.entries = {}
+        if self.path.exists():
+            self.path.unlink()
+
+
+def get_checkpoint(
+    input_path: Path,
+    algorithm: str,
+    interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+) -> Checkpoint:
+    stat = input_path.stat()
+    return Checkpoint(
+        input_path.with_suffix(input_path.suffix + ".ckpt"),
+        {
+            "algorithm": algorithm,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        },
+        interval=interval,
+    )
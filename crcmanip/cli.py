@@ -1,11 +1,43 @@
-import io
+import json
 import typing as T
 from pathlib import Path
 
 import click
 
-from crcmanip.algorithm import apply_patch, consume
+from crcmanip.algorithm import (
+    CHARSETS,
+    InvalidPositionError,
+    UnsolvablePatchError,
+    consume,
+    patch_file,
+    stream_patch,
+)
+from crcmanip.archive import (
+    CorruptArchiveError,
+    InvalidArchiveError,
+    checksum_archive,
+)
+from crcmanip.backends import (
+    BACKEND_MODULES,
+    UnavailableBackendError,
+    get_available_backends,
+    get_backend_name,
+    set_backend,
+)
+from crcmanip.blocks import BLOCK_FORMATS, checksum_blocks
+from crcmanip.checkpoint import get_checkpoint
 from crcmanip.crc import BaseCRC
+from crcmanip.index import get_index
+from crcmanip.manifest import (
+    FORMATS,
+    STATUS_OK,
+    InvalidManifestError,
+    parse_manifest,
+    verify_manifest,
+)
+from crcmanip.reader import DEFAULT_QUEUE_DEPTH, READ_MODES
+from crcmanip.rolling import find_windows
+from crcmanip.server import serve as serve_socket
 from crcmanip.utils import disable_progressbars
 
 CRC_FACTORY = {cls.__name__: cls() for cls in BaseCRC.__subclasses__()}
@@ -19,8 +51,84 @@ class PathPath(click.Path):
 
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
-def cli() -> None:
-    pass
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKEND_MODULES), case_sensitive=False),
+    help="CRC engine to use.",
+)
+def cli(backend: T.Optional[str] = None) -> None:
+    if backend:
+        try:
+            set_backend(backend)
+        except UnavailableBackendError as ex:
+            raise click.BadParameter(str(ex), param_hint="--backend") from ex
+
+
+@cli.command()
+def backends() -> None:
+    """List the available CRC engines, marking the active one."""
+    active_backend = get_backend_name()
+    for backend in get_available_backends():
+        click.echo(f"{'*' if backend == active_backend else ' '} {backend}")
+
+
+def calc_archive(crc: BaseCRC, path: Path) -> None:
+    try:
+        members = checksum_archive(crc, path)
+    except InvalidArchiveError as ex:
+        raise click.BadParameter(str(ex)) from ex
+
+    failed = False
+    try:
+        for member in members:
+            if member.checksum is None:
+                click.echo(f"{member.name}: FAILED", err=True)
+                failed = True
+            else:
+                click.echo(
+                    f"{member.name} {member.checksum:0{crc.num_bytes * 2}X}"
+                )
+    except CorruptArchiveError as ex:
+        raise click.ClickException(f"{path}: {ex}") from ex
+    if failed:
+        raise click.exceptions.Exit(1)
+
+
+def calc_blocks(
+    crc: BaseCRC,
+    path: Path,
+    block_size: int,
+    block_format: str,
+    read_mode: str,
+    queue_depth: int,
+) -> None:
+    with path.open("rb") as handle:
+        checksums = checksum_blocks(
+            crc,
+            handle,
+            block_size,
+            read_mode=read_mode,
+            queue_depth=queue_depth,
+        )
+
+    if block_format == "binary":
+        with click.open_file("-", "wb") as output_handle:
+            for checksum in [crc.digest()] + checksums:
+                output_handle.write(checksum.to_bytes(crc.num_bytes, "big"))
+        return
+
+    click.echo(
+        json.dumps(
+            {
+                "checksum": crc.hex_digest(),
+                "block_size": block_size,
+                "blocks": [
+                    f"{checksum:0{crc.num_bytes * 2}X}"
+                    for checksum in checksums
+                ],
+            }
+        )
+    )
 
 
 @cli.command()
@@ -32,16 +140,144 @@ def cli() -> None:
     help="Checksum type.",
 )
 @click.option("-q", "--quiet", help="Disable progressbars.", is_flag=True)
+@click.option(
+    "-r",
+    "--resume",
+    is_flag=True,
+    help="Save progress periodically and resume from the last checkpoint.",
+)
+@click.option(
+    "--start",
+    "start_pos",
+    type=click.IntRange(min=0),
+    help="Offset of the first byte to checksum.",
+)
+@click.option(
+    "--end",
+    "end_pos",
+    type=click.IntRange(min=0),
+    help="Offset past the last byte to checksum.",
+)
+@click.option(
+    "-i",
+    "--index",
+    "use_index",
+    is_flag=True,
+    help="Answer from a prefix index stored next to the file.",
+)
+@click.option(
+    "--read-mode",
+    type=click.Choice(READ_MODES, case_sensitive=False),
+    default=READ_MODES[0],
+    help="Keep read data out of the page cache with dontneed or direct.",
+)
+@click.option(
+    "--queue-depth",
+    type=click.IntRange(min=0),
+    default=DEFAULT_QUEUE_DEPTH,
+    help="Number of chunks to read ahead in the background (0 disables).",
+)
+@click.option(
+    "-A",
+    "--archive",
+    is_flag=True,
+    help="Print the checksums of the files inside a zip or tar archive.",
+)
+@click.option(
+    "-B",
+    "--block-size",
+    type=click.IntRange(min=1),
+    help="Also print the checksum of every block of this size.",
+)
+@click.option(
+    "--block-format",
+    type=click.Choice(BLOCK_FORMATS, case_sensitive=False),
+    default=BLOCK_FORMATS[0],
+    help="Output format for --block-size.",
+)
 @click.argument("path", type=PathPath(exists=True, dir_okay=False))
-def calc(algorithm: str, quiet: bool, path: Path) -> None:
-    """Print the checksum of a given PATH to the standard output."""
+def calc(
+    algorithm: str,
+    quiet: bool,
+    resume: bool,
+    start_pos: T.Optional[int],
+    end_pos: T.Optional[int],
+    use_index: bool,
+    read_mode: str,
+    queue_depth: int,
+    archive: bool,
+    block_size: T.Optional[int],
+    block_format: str,
+    path: Path,
+) -> None:
+    """Print the checksum of a given PATH to the standard output.
+
+    With --start or --end, only the given range of PATH is checksummed.
+    With --archive, each file in the archive is printed as "NAME CHECKSUM",
+    without extracting it; zip members that do not match the CRC32 stored
+    in the archive are reported as failed.
+
+    With --block-size, the checksum of the whole file and of each block are
+    printed as a JSON object, or in binary as big-endian values (the whole
+    file first), in a single pass over PATH.
+    """
     if quiet:
         disable_progressbars()
 
-    crc = CRC_FACTORY[algorithm]
+    crc = CRC_FACTORY[algorithm].reset()
+    if archive or block_size:
+        if resume or use_index or start_pos is not None or end_pos is not None:
+            raise click.UsageError(
+                "--archive and --block-size cannot be combined with ranges,"
+                " indexes or --resume."
+            )
+        if archive and block_size:
+            raise click.UsageError(
+                "--archive cannot be combined with --block-size."
+            )
+    if archive:
+        calc_archive(crc, path)
+        return
+    if block_size:
+        calc_blocks(
+            crc, path, block_size, block_format, read_mode, queue_depth
+        )
+        return
+
+    file_size = path.stat().st_size
+    if start_pos is None:
+        start_pos = 0
+    if end_pos is None:
+        end_pos = file_size
+    if start_pos > end_pos or end_pos > file_size:
+        raise click.BadParameter("Range is located outside the file.")
+
+    if use_index:
+        index = get_index(path, crc, algorithm)
+        with path.open("rb") as handle:
+            crc.reset(
+                raw_value=index.get_next_value(
+                    handle, start_pos, end_pos, crc.initial_xor
+                ),
+                consumed=end_pos - start_pos,
+            )
+        click.echo(crc.hex_digest())
+        return
+
+    checkpoint = get_checkpoint(path, algorithm) if resume else None
     with path.open("rb") as handle:
-        consume(crc, handle)
+        consume(
+            crc,
+            handle,
+            start_pos,
+            end_pos,
+            checkpoint=checkpoint,
+            read_mode=read_mode,
+            queue_depth=queue_depth,
+        )
     click.echo(crc.hex_digest())
+    if checkpoint:
+        checkpoint.remove()
 
 
 @cli.command()
@@ -53,7 +289,9 @@ def calc(algorithm: str, quiet: bool, path: Path) -> None:
     help="Checksum type.",
 )
 @click.option("-q", "--quiet", help="Disable progressbars.", is_flag=True)
-@click.argument("input_path", type=PathPath(exists=True, dir_okay=False))
+@click.argument(
+    "input_path", type=PathPath(exists=True, dir_okay=False, allow_dash=True)
+)
 @click.argument("target_checksum", type=lambda x: int(x, 16))
 @click.option(
     "-o",
@@ -81,6 +319,31 @@ def calc(algorithm: str, quiet: bool, path: Path) -> None:
     type=int,
     help="Position to apply the patch at.",
 )
+@click.option(
+    "-c",
+    "--charset",
+    type=click.Choice(CHARSETS.keys(), case_sensitive=False),
+    help="Restrict the patch bytes to a character set.",
+)
+@click.option(
+    "-s",
+    "--patch-size",
+    type=int,
+    help="Number of patch bytes to use with --charset.",
+)
+@click.option(
+    "-r",
+    "--resume",
+    is_flag=True,
+    help="Save progress periodically and resume from the last checkpoint.",
+)
+@click.option(
+    "-i",
+    "--index",
+    "use_index",
+    is_flag=True,
+    help="Use a prefix index stored next to the file.",
+)
 def patch(
     algorithm: str,
     quiet: bool,
@@ -90,50 +353,207 @@ def patch(
     backup: bool,
     overwrite: bool,
     target_pos: T.Optional[int],
+    charset: T.Optional[str],
+    patch_size: T.Optional[int],
+    resume: bool,
+    use_index: bool,
 ) -> None:
     """Patch the INPUT_PATH so that its checksum becomes TARGET_CHECKSUM.
 
-    TARGET_CHECKSUM must be a valid hexadecimal value.
+    TARGET_CHECKSUM must be a valid hexadecimal value. If INPUT_PATH is -,
+    the standard input is patched in a single pass and written to the
+    standard output, unless an output path is given.
     """
     if quiet:
         disable_progressbars()
 
     crc = CRC_FACTORY[algorithm]
-    output_path_provided = output_path is not None
-    if not output_path_provided:
-        output_path = input_path.with_suffix(input_path.suffix + ".tmp")
-
-    assert input_path
-    assert output_path
-    with input_path.open("rb") as input_handle, output_path.open(
-        "wb"
-    ) as output_handle:
-        input_handle.seek(0, io.SEEK_END)
-        file_size = input_handle.tell()
-
-        if target_pos is None:
-            target_pos = file_size
-            if overwrite:
-                target_pos -= crc.num_bytes
-                if target_pos < 0:
-                    target_pos = 0
-        while target_pos < 0:
-            target_pos += file_size
-
-        apply_patch(
+    charset_bytes = CHARSETS[charset] if charset else None
+    if patch_size is not None and charset is None:
+        raise click.UsageError("--patch-size needs --charset.")
+
+    if str(input_path) == "-":
+        if resume:
+            raise click.UsageError("Cannot resume patching a stream.")
+        if use_index:
+            raise click.UsageError("Cannot index a stream.")
+        if backup:
+            raise click.UsageError("Cannot back up the standard input.")
+        if target_pos is None and overwrite:
+            raise click.UsageError("Overwriting a stream needs a position.")
+        if target_pos is not None and target_pos < 0:
+            raise click.UsageError("Stream positions cannot be negative.")
+        with click.open_file("-", "rb") as input_handle, click.open_file(
+            str(output_path) if output_path else "-", "wb"
+        ) as output_handle:
+            if target_pos is not None and not output_handle.seekable():
+                raise click.UsageError(
+                    "Patching inside a stream needs a seekable output."
+                )
+            try:
+                stream_patch(
+                    crc,
+                    target_checksum,
+                    input_handle,
+                    output_handle,
+                    target_pos=target_pos,
+                    overwrite=overwrite,
+                    charset=charset_bytes,
+                    patch_size=patch_size,
+                )
+            except (InvalidPositionError, UnsolvablePatchError) as ex:
+                raise click.ClickException(str(ex)) from ex
+        return
+
+    checkpoint = get_checkpoint(input_path, algorithm) if resume else None
+    index = get_index(input_path, crc, algorithm) if use_index else None
+    try:
+        patch_file(
             crc,
             target_checksum,
-            input_handle,
-            output_handle,
-            target_pos=target_pos,
+            input_path,
+            output_path,
+            backup=backup,
             overwrite=overwrite,
+            target_pos=target_pos,
+            charset=charset_bytes,
+            patch_size=patch_size,
+            checkpoint=checkpoint,
+            index=index,
         )
+    except (InvalidPositionError, UnsolvablePatchError) as ex:
+        raise click.ClickException(str(ex)) from ex
+    if checkpoint:
+        checkpoint.remove()
 
-    if not output_path_provided:
-        if backup:
-            input_path.rename(
-                input_path.with_suffix(input_path.suffix + ".bak")
-            )
-        else:
-            input_path.unlink()
-        output_path.rename(input_path)
+
+@cli.command()
+@click.option(
+    "-a",
+    "--algorithm",
+    type=click.Choice(CRC_FACTORY.keys(), case_sensitive=False),
+    default=list(CRC_FACTORY.keys())[0],
+    help="Checksum type.",
+)
+@click.option("-q", "--quiet", help="Disable progressbars.", is_flag=True)
+@click.option(
+    "-w",
+    "--window",
+    "window_size",
+    type=click.IntRange(min=1),
+    required=True,
+    help="Size of the searched block.",
+)
+@click.argument("path", type=PathPath(exists=True, dir_okay=False))
+@click.argument(
+    "target_checksums", type=lambda x: int(x, 16), nargs=-1, required=True
+)
+def search(
+    algorithm: str,
+    quiet: bool,
+    window_size: int,
+    path: Path,
+    target_checksums: T.Tuple[int, ...],
+) -> None:
+    """Print the offsets of blocks in PATH matching TARGET_CHECKSUMS.
+
+    Every block of the given window size is checked, one offset per line.
+    TARGET_CHECKSUMS must be valid hexadecimal values.
+    """
+    if quiet:
+        disable_progressbars()
+
+    crc = CRC_FACTORY[algorithm].reset()
+    with path.open("rb") as handle:
+        for offset in find_windows(crc, handle, window_size, target_checksums):
+            click.echo(offset)
+
+
+@cli.command()
+@click.option(
+    "-f",
+    "--format",
+    "manifest_format",
+    type=click.Choice(FORMATS, case_sensitive=False),
+    default=FORMATS[0],
+    help="Manifest format.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of files to verify in parallel.",
+)
+@click.option(
+    "-x",
+    "--fail-fast",
+    is_flag=True,
+    help="Stop at the first file that does not match.",
+)
+@click.option(
+    "--read-mode",
+    type=click.Choice(READ_MODES, case_sensitive=False),
+    default=READ_MODES[0],
+    help="Keep read data out of the page cache with dontneed or direct.",
+)
+@click.option(
+    "--queue-depth",
+    type=click.IntRange(min=0),
+    default=DEFAULT_QUEUE_DEPTH,
+    help="Number of chunks to read ahead in the background (0 disables).",
+)
+@click.argument("manifest_path", type=PathPath(exists=True, dir_okay=False))
+def check(
+    manifest_format: str,
+    jobs: T.Optional[int],
+    fail_fast: bool,
+    read_mode: str,
+    queue_depth: int,
+    manifest_path: Path,
+) -> None:
+    """Verify the files listed in MANIFEST_PATH.
+
+    Supports SFV files, the output of cksum and lists of file names with
+    the CRC32 embedded in brackets, such as "file [DEADBEEF].mkv".
+    """
+    disable_progressbars()
+
+    try:
+        entries = parse_manifest(manifest_path, manifest_format)
+    except InvalidManifestError as ex:
+        raise click.ClickException(f"{manifest_path}: {ex}") from ex
+    failed = False
+    for entry, status in verify_manifest(
+        entries,
+        CRC_FACTORY,
+        jobs=jobs,
+        fail_fast=fail_fast,
+        read_mode=read_mode,
+        queue_depth=queue_depth,
+    ):
+        click.echo(f"{entry.name}: {status}")
+        failed |= status != STATUS_OK
+
+    if failed:
+        raise click.exceptions.Exit(1)
+
+
+@cli.command()
+@click.argument("socket_path", type=PathPath(dir_okay=False))
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of worker threads.",
+)
+def serve(socket_path: Path, jobs: T.Optional[int]) -> None:
+    """Serve checksum requests on a Unix socket at SOCKET_PATH.
+
+    Each line sent to the socket is a JSON request, such as
+    {"id": 1, "command": "calc", "path": "file.txt", "algorithm": "CRC32"}
+    or {"id": 2, "command": "patch", "path": "file.txt", "checksum": "BEEF"}.
+    Each response is a JSON line with the same id and either a result or
+    an error.
+    """
+    disable_progressbars()
+    serve_socket(socket_path, CRC_FACTORY, jobs=jobs)
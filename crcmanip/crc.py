@@ -1,7 +1,8 @@
 import typing as T
 from functools import lru_cache
 
-from crcmanip.fastcrc import crc_next, crc_prev
+from crcmanip.backends import get_backend
+from crcmanip.gf2 import multiply
 from crcmanip.utils import get_polynomial_reverse, swap_endian
 
 
@@ -51,7 +52,28 @@ def create_reverse_lookup_table(
     return tuple(table)
 
 
+@lru_cache(maxsize=None)
+def create_zeros_operator(
+    crc_cls: T.Type["BaseCRC"], power: int, reverse: bool
+) -> T.Tuple[int, ...]:
+    if power:
+        operator = create_zeros_operator(crc_cls, power - 1, reverse)
+        return tuple(multiply(operator, column) for column in operator)
+
+    crc = crc_cls()
+    func = crc.get_prev_value if reverse else crc.get_next_value
+    return tuple(func(b"\0", 1 << bit) for bit in range(crc.num_bits))
+
+
 class BaseCRC:
+    __slots__ = (
+        "num_bytes",
+        "lookup_table",
+        "lookup_table_reverse",
+        "_value",
+        "_consumed",
+    )
+
     num_bits: int = NotImplemented
     polynomial: int = NotImplemented
     initial_xor: int = 0
@@ -73,11 +95,29 @@ class BaseCRC:
         self._value = self.initial_xor
         self._consumed = 0
 
-    def reset(self, raw_value: T.Optional[int] = None) -> "BaseCRC":
+    def reset(
+        self, raw_value: T.Optional[int] = None, consumed: int = 0
+    ) -> "BaseCRC":
         self._value = raw_value if raw_value is not None else self.initial_xor
-        self._consumed = 0
+        self._consumed = consumed
         return self
 
+    def copy(self) -> "BaseCRC":
+        """Return an independent CRC in the same state.
+
+        The lookup tables are immutable and shared with the original, so
+        only the running value and the consumed byte count are copied.
+        """
+        clone = object.__new__(type(self))
+        clone.num_bytes = self.num_bytes
+        clone.lookup_table = self.lookup_table
+        clone.lookup_table_reverse = self.lookup_table_reverse
+        clone._value = self._value
+        clone._consumed = self._consumed
+        return clone
+
+    __copy__ = copy
+
     def update(self, source: bytes) -> "BaseCRC":
         self._value = self.get_next_value(source, self._value) & (
             (1 << self.num_bits) - 1
@@ -92,6 +132,16 @@ class BaseCRC:
         self._consumed += len(source)
         return self
 
+    def update_zeros(self, count: int) -> "BaseCRC":
+        self._value = self.get_next_zeros_value(count, self._value)
+        self._consumed += count
+        return self
+
+    def update_zeros_reverse(self, count: int) -> "BaseCRC":
+        self._value = self.get_prev_zeros_value(count, self._value)
+        self._consumed += count
+        return self
+
     def digest(self) -> int:
         value = self._value
 
@@ -111,17 +161,39 @@ class BaseCRC:
         return "%0*X" % (self.num_bytes * 2, self.digest())
 
     def get_prev_value(self, source: bytes, value: int) -> int:
-        return T.cast(int, crc_prev(self, source, value))
+        return T.cast(int, get_backend().crc_prev(self, source, value))
 
     def get_next_value(self, source: bytes, value: int) -> int:
-        return T.cast(int, crc_next(self, source, value))
+        return T.cast(int, get_backend().crc_next(self, source, value))
+
+    def get_prev_zeros_value(self, count: int, value: int) -> int:
+        return self._shift_zeros(count, value, reverse=True)
+
+    def get_next_zeros_value(self, count: int, value: int) -> int:
+        return self._shift_zeros(count, value, reverse=False)
+
+    def _shift_zeros(self, count: int, value: int, reverse: bool) -> int:
+        power = 0
+        while count:
+            if count & 1:
+                value = multiply(
+                    create_zeros_operator(type(self), power, reverse), value
+                )
+            count >>= 1
+            power += 1
+        return value
 
     @property
     def raw_value(self) -> int:
         return self._value
 
+    @property
+    def consumed(self) -> int:
+        return self._consumed
+
 
 class CRC32(BaseCRC):
+    __slots__ = ()
     num_bits = 32
     polynomial = 0x04C11DB7
     initial_xor = 0xFFFFFFFF
@@ -129,6 +201,7 @@ class CRC32(BaseCRC):
 
 
 class CRC32POSIX(BaseCRC):
+    __slots__ = ()
     num_bits = 32
     polynomial = 0x04C11DB7
     final_xor = 0xFFFFFFFF
@@ -137,16 +210,19 @@ class CRC32POSIX(BaseCRC):
 
 
 class CRC16CCITT(BaseCRC):
+    __slots__ = ()
     num_bits = 16
     polynomial = 0x1021
 
 
 class CRC16XMODEM(BaseCRC):
+    __slots__ = ()
     num_bits = 16
     polynomial = 0x1021
     big_endian = True
 
 
 class CRC16IBM(BaseCRC):
+    __slots__ = ()
     num_bits = 16
     polynomial = 0x8005
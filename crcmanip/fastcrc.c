@@ -31,6 +31,7 @@ static PyObject *CrcNext(PyObject *self, PyObject *args) {
 
     const uint32_t mask = (1ull << num_bits) - 1ull;
     int shift = (num_bytes << 3) - 8;
+    Py_BEGIN_ALLOW_THREADS
     if (big_endian) {
         for (int i = 0; i < strsize; i++) {
             uint8_t c = *str++;
@@ -46,6 +47,7 @@ static PyObject *CrcNext(PyObject *self, PyObject *args) {
             value &= mask;
         }
     }
+    Py_END_ALLOW_THREADS
 
     return PyLong_FromLong(value);
 }
@@ -85,6 +87,7 @@ static PyObject *CrcPrev(PyObject *self, PyObject *args) {
     const uint32_t mask = (1ull << num_bits) - 1ull;
     str += strsize - 1;
     int shift = (num_bytes << 3) - 8;
+    Py_BEGIN_ALLOW_THREADS
     if (big_endian) {
         for (int i = 0; i < strsize; i++) {
             uint8_t c = *str--;
@@ -105,12 +108,127 @@ static PyObject *CrcPrev(PyObject *self, PyObject *args) {
             value &= mask;
         }
     }
+    Py_END_ALLOW_THREADS
     return PyLong_FromLong(value);
 }
 
+static int CompareChecksums(const void *a, const void *b) {
+    const uint32_t x = *(const uint32_t*)a;
+    const uint32_t y = *(const uint32_t*)b;
+    return (x > y) - (x < y);
+}
+
+static PyObject *CrcRoll(PyObject *self, PyObject *args) {
+    char *str = NULL;
+    Py_ssize_t strsize = 0;
+    uint32_t value = 0;
+    Py_ssize_t window_size = 0;
+    PyObject *crc;
+    PyObject *py_out_table;
+    PyObject *py_targets;
+
+    if (!PyArg_ParseTuple(
+        args, "Oy#InO!O!", &crc, &str, &strsize, &value, &window_size,
+        &PyTuple_Type, &py_out_table, &PyTuple_Type, &py_targets
+    )) {
+        return NULL;
+    }
+    if (window_size <= 0 || PyTuple_Size(py_out_table) != 256) {
+        PyErr_SetString(PyExc_ValueError, "invalid rolling window");
+        return NULL;
+    }
+
+    const int num_bytes = PyLong_AsLong(
+        PyObject_GetAttrString(crc, "num_bytes")
+    );
+    const int num_bits = PyLong_AsLong(
+        PyObject_GetAttrString(crc, "num_bits")
+    );
+    const int big_endian = PyObject_IsTrue(
+        PyObject_GetAttrString(crc, "big_endian")
+    );
+    uint32_t lookup_table[256] = {0};
+    uint32_t out_table[256] = {0};
+    PyObject *py_lookup_table = PyObject_GetAttrString(crc, "lookup_table");
+    if (!py_lookup_table) {
+        return NULL;
+    }
+    for (int i = 0; i < 256; i++) {
+        lookup_table[i] = PyLong_AsLong(PyTuple_GetItem(py_lookup_table, i));
+        out_table[i] = PyLong_AsLong(PyTuple_GetItem(py_out_table, i));
+    }
+
+    const Py_ssize_t num_targets = PyTuple_Size(py_targets);
+    uint32_t *targets = PyMem_Malloc((num_targets + 1) * sizeof(uint32_t));
+    Py_ssize_t max_offsets = 16;
+    Py_ssize_t num_offsets = 0;
+    Py_ssize_t *offsets = PyMem_Malloc(max_offsets * sizeof(Py_ssize_t));
+    if (!targets || !offsets) {
+        PyMem_Free(targets);
+        PyMem_Free(offsets);
+        return PyErr_NoMemory();
+    }
+    for (Py_ssize_t i = 0; i < num_targets; i++) {
+        targets[i] = PyLong_AsUnsignedLong(PyTuple_GetItem(py_targets, i));
+    }
+    qsort(targets, num_targets, sizeof(uint32_t), CompareChecksums);
+
+    const uint32_t mask = (1ull << num_bits) - 1ull;
+    int shift = (num_bytes << 3) - 8;
+    int out_of_memory = 0;
+    Py_BEGIN_ALLOW_THREADS
+    for (Py_ssize_t i = window_size; i < strsize; i++) {
+        uint8_t c = str[i];
+        value ^= out_table[(uint8_t)str[i - window_size]];
+        if (big_endian) {
+            uint8_t index = c ^ (value >> shift);
+            value = lookup_table[index] ^ (value << 8);
+        } else {
+            uint8_t index = c ^ value;
+            value = lookup_table[index] ^ (value >> 8);
+        }
+        value &= mask;
+
+        if (num_targets && bsearch(
+            &value, targets, num_targets, sizeof(uint32_t), CompareChecksums
+        )) {
+            if (num_offsets == max_offsets) {
+                max_offsets *= 2;
+                Py_ssize_t *new_offsets = PyMem_Realloc(
+                    offsets, max_offsets * sizeof(Py_ssize_t)
+                );
+                if (!new_offsets) {
+                    out_of_memory = 1;
+                    break;
+                }
+                offsets = new_offsets;
+            }
+            offsets[num_offsets++] = i - window_size + 1;
+        }
+    }
+    Py_END_ALLOW_THREADS
+    PyMem_Free(targets);
+
+    if (out_of_memory) {
+        PyMem_Free(offsets);
+        return PyErr_NoMemory();
+    }
+    PyObject *py_offsets = PyList_New(num_offsets);
+    if (!py_offsets) {
+        PyMem_Free(offsets);
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < num_offsets; i++) {
+        PyList_SET_ITEM(py_offsets, i, PyLong_FromSsize_t(offsets[i]));
+    }
+    PyMem_Free(offsets);
+    return Py_BuildValue("(kN)", (unsigned long)value, py_offsets);
+}
+
 static PyMethodDef FastCrcMethods[] = {
     {"crc_next", CrcNext, METH_VARARGS, "crc_next"},
     {"crc_prev", CrcPrev, METH_VARARGS, "crc_prev"},
+    {"crc_roll", CrcRoll, METH_VARARGS, "crc_roll"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -0,0 +1,75 @@
+import typing as T
+from functools import lru_cache
+
+
+def multiply(columns: T.Sequence[int], vector: int) -> int:
+    """Multiply a matrix, given as a sequence of columns, by a bit vector."""
+    result = 0
+    for column in columns:
+        if not vector:
+            break
+        if vector & 1:
+            result ^= column
+        vector >>= 1
+    return result
+
+
+def solve(columns: T.Sequence[int], target: int) -> T.Optional[int]:
+    """Solve a linear system over GF(2).
+
+    Each column is a bit vector; the result is a bit mask selecting the
+    columns whose XOR equals the target, or None if there is no solution.
+    """
+    basis: T.Dict[int, T.Tuple[int, int]] = {}
+    for num, column in enumerate(columns):
+        combination = 1 << num
+        while column:
+            pivot = column.bit_length() - 1
+            if pivot not in basis:
+                basis[pivot] = (column, combination)
+                break
+            column ^= basis[pivot][0]
+            combination ^= basis[pivot][1]
+
+    result = 0
+    while target:
+        pivot = target.bit_length() - 1
+        if pivot not in basis:
+            return None
+        target ^= basis[pivot][0]
+        result ^= basis[pivot][1]
+    return result
+
+
+@lru_cache
+def find_affine_subspaces(
+    charset: bytes,
+) -> T.Tuple[T.Tuple[int, T.Tuple[int, ...]], ...]:
+    """Find the largest affine subspaces of bytes contained in a charset.
+
+    Returns (base, basis) pairs, so that every XOR of base with any
+    combination of the basis vectors is a member of the charset.
+    """
+    allowed = frozenset(charset)
+    subspaces: T.Dict[T.FrozenSet[int], T.Tuple[int, T.Tuple[int, ...]]] = {}
+    for base in sorted(allowed):
+        span = [0]
+        basis: T.List[int] = []
+        for member in sorted(allowed):
+            vector = base ^ member
+            if vector in span:
+                continue
+            if all(base ^ item ^ vector in allowed for item in span):
+                span += [item ^ vector for item in span]
+                basis.append(vector)
+        members = frozenset(base ^ item for item in span)
+        subspaces[members] = (min(members), tuple(basis))
+
+    best_dim = max(len(basis) for _base, basis in subspaces.values())
+    return tuple(
+        sorted(
+            (base, basis)
+            for base, basis in subspaces.values()
+            if len(basis) == best_dim
+        )
+    )
@@ -0,0 +1,189 @@
+import io
+import mmap
+import os
+import struct
+import sys
+import typing as T
+from array import array
+from pathlib import Path
+
+from crcmanip.algorithm import DEFAULT_CHUNK_SIZE, get_regions
+from crcmanip.crc import BaseCRC
+from crcmanip.utils import track_progress
+
+DEFAULT_INDEX_INTERVAL = 1024 * 1024
+
+INDEX_MAGIC = b"CRCIDX01"
+INDEX_HEADER = struct.Struct("<8s16sQQQQ")
+INDEX_TYPECODES = {16: "H", 32: "I"}
+
+
+class CRCIndex:
+    """CRC states of the prefixes of a file, recorded every interval bytes.
+
+    The states are hashed from zero, which makes them the linear part of
+    the CRC. Combining two of them with a zero shift gives the state of
+    any range, so a query hashes at most two intervals of the file.
+    """
+
+    def __init__(
+        self,
+        crc: BaseCRC,
+        interval: int,
+        file_size: int,
+        states: T.Sequence[int],
+    ) -> None:
+        assert interval > 0
+        assert len(states) == file_size // interval + 1
+        self.crc = crc.copy()
+        self.interval = interval
+        self.file_size = file_size
+        self.states = states
+
+    def get_prefix_value(self, handle: T.IO[bytes], pos: int) -> int:
+        if pos < 0 or pos > self.file_size:
+            raise ValueError("position is located outside the indexed file")
+        num = pos // self.interval
+        handle.seek(num * self.interval, io.SEEK_SET)
+        return self.crc.get_next_value(
+            handle.read(pos - num * self.interval), self.states[num]
+        )
+
+    def get_range_value(
+        self, handle: T.IO[bytes], start_pos: int, end_pos: int
+    ) -> int:
+        """Return the state after hashing the given range from zero."""
+        return self.get_prefix_value(
+            handle, end_pos
+        ) ^ self.crc.get_next_zeros_value(
+            end_pos - start_pos, self.get_prefix_value(handle, start_pos)
+        )
+
+    def get_next_value(
+        self, handle: T.IO[bytes], start_pos: int, end_pos: int, value: int
+    ) -> int:
+        """Hash the given range forward, like consume does."""
+        return self.crc.get_next_zeros_value(
+            end_pos - start_pos, value
+        ) ^ self.get_range_value(handle, start_pos, end_pos)
+
+    def get_prev_value(
+        self, handle: T.IO[bytes], start_pos: int, end_pos: int, value: int
+    ) -> int:
+        """Hash the given range backwards, like consume_reverse does."""
+        return self.crc.get_prev_zeros_value(
+            end_pos - start_pos,
+            value ^ self.get_range_value(handle, start_pos, end_pos),
+        )
+
+    def save(self, path: Path, identity: T.Dict[str, T.Any]) -> None:
+        states = array(INDEX_TYPECODES[self.crc.num_bits], self.states)
+        if sys.byteorder != "little":
+            states.byteswap()
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(
+                INDEX_HEADER.pack(
+                    INDEX_MAGIC,
+                    str(identity["algorithm"]).encode(),
+                    self.interval,
+                    identity["size"],
+                    identity["mtime_ns"],
+                    len(states),
+                )
+            )
+            states.tofile(handle)
+        os.replace(tmp_path, path)
+
+
+def build_index(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    interval: int = DEFAULT_INDEX_INTERVAL,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> CRCIndex:
+    handle.seek(0, io.SEEK_END)
+    file_size = handle.tell()
+    state = crc.copy().reset(raw_value=0)
+    states = [0]
+
+    with track_progress(desc="index", total=file_size) as progress:
+        for pos, region_end, is_hole in get_regions(handle, 0, file_size):
+            if not is_hole:
+                handle.seek(pos, io.SEEK_SET)
+            while pos < region_end:
+                next_pos = min(
+                    region_end,
+                    pos + chunk_size,
+                    (pos // interval + 1) * interval,
+                )
+                if is_hole:
+                    state.update_zeros(next_pos - pos)
+                else:
+                    state.update(handle.read(next_pos - pos))
+                progress.update(next_pos - pos)
+                pos = next_pos
+                if pos % interval == 0:
+                    states.append(state.raw_value)
+
+    return CRCIndex(crc, interval, file_size, states)
+
+
+def load_index(
+    path: Path, crc: BaseCRC, identity: T.Dict[str, T.Any]
+) -> T.Optional[CRCIndex]:
+    """Memory-map a saved index, or return None if it is missing or stale."""
+    try:
+        with path.open("rb") as handle:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(data) < INDEX_HEADER.size:
+        return None
+    magic, algorithm, interval, size, mtime_ns, count = INDEX_HEADER.unpack(
+        data[: INDEX_HEADER.size]
+    )
+    if (
+        magic != INDEX_MAGIC
+        or algorithm.rstrip(b"\0").decode() != identity["algorithm"]
+        or size != identity["size"]
+        or mtime_ns != identity["mtime_ns"]
+        or not interval
+        or count != size // interval + 1
+        or len(data) != INDEX_HEADER.size + count * crc.num_bytes
+    ):
+        return None
+
+    states: T.Sequence[int]
+    if sys.byteorder == "little":
+        states = memoryview(data)[INDEX_HEADER.size :].cast(
+            INDEX_TYPECODES[crc.num_bits]
+        )
+    else:
+        states = array(INDEX_TYPECODES[crc.num_bits])
+        states.frombytes(data[INDEX_HEADER.size :])
+        states.byteswap()
+    return CRCIndex(crc, interval, size, states)
+
+
+def get_index(
+    input_path: Path,
+    crc: BaseCRC,
+    algorithm: str,
+    interval: int = DEFAULT_INDEX_INTERVAL,
+) -> CRCIndex:
+    """Load the sidecar index of a file, building it first if needed."""
+    stat = input_path.stat()
+    index_path = input_path.with_suffix(input_path.suffix + ".crcidx")
+    identity = {
+        "algorithm": algorithm,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    index = load_index(index_path, crc, identity)
+    if index is None:
+        with input_path.open("rb") as handle:
+            index = build_index(crc, handle, interval=interval)
+        index.save(index_path, identity)
+    return index
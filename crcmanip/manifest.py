@@ -0,0 +1,158 @@
+import os
+import re
+import typing as T
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from crcmanip.algorithm import consume
+from crcmanip.crc import BaseCRC
+from crcmanip.reader import DEFAULT_QUEUE_DEPTH
+
+STATUS_OK = "OK"
+STATUS_FAILED = "FAILED"
+STATUS_MISSING = "MISSING"
+STATUS_ERROR = "ERROR"
+
+CKSUM_RE = re.compile(r"^(?P<checksum>\d+)\s+(?P<size>\d+)\s+(?P<name>.+)$")
+SFV_RE = re.compile(r"^(?P<name>.+?)\s+(?P<checksum>[0-9A-Fa-f]{8})$")
+FILENAME_RE = re.compile(r"[\[(](?P<checksum>[0-9A-Fa-f]{8})[\])]")
+
+FORMATS = ["auto", "sfv", "cksum", "filename"]
+
+
+class InvalidManifestError(ValueError):
+    def __init__(self, line_num: int) -> None:
+        super().__init__(f"unrecognized manifest entry on line {line_num}")
+
+
+class ManifestEntry(T.NamedTuple):
+    name: str
+    path: Path
+    algorithm: str
+    checksum: int
+    size: T.Optional[int] = None
+
+
+def parse_manifest_line(
+    line: str, base_dir: Path, manifest_format: str
+) -> T.Optional[ManifestEntry]:
+    if manifest_format in {"auto", "cksum"}:
+        match = CKSUM_RE.match(line)
+        if match:
+            return ManifestEntry(
+                name=match.group("name"),
+                path=base_dir / match.group("name"),
+                algorithm="CRC32POSIX",
+                checksum=int(match.group("checksum")),
+                size=int(match.group("size")),
+            )
+
+    if manifest_format in {"auto", "sfv"}:
+        match = SFV_RE.match(line)
+        if match:
+            return ManifestEntry(
+                name=match.group("name"),
+                path=base_dir / match.group("name"),
+                algorithm="CRC32",
+                checksum=int(match.group("checksum"), 16),
+            )
+
+    if manifest_format in {"auto", "filename"}:
+        matches = list(FILENAME_RE.finditer(line))
+        if matches:
+            return ManifestEntry(
+                name=line,
+                path=base_dir / line,
+                algorithm="CRC32",
+                checksum=int(matches[-1].group("checksum"), 16),
+            )
+
+    return None
+
+
+def parse_manifest(
+    path: Path, manifest_format: str = "auto"
+) -> T.List[ManifestEntry]:
+    """Read SFV, cksum or CRC-in-filename manifests.
+
+    Paths in the manifest are relative to the manifest directory. Lines
+    starting with a semicolon are comments, as in SFV files.
+    """
+    entries: T.List[ManifestEntry] = []
+    with path.open("r", encoding="utf-8", errors="surrogateescape") as handle:
+        for line_num, line in enumerate(handle, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith(";"):
+                continue
+            entry = parse_manifest_line(line, path.parent, manifest_format)
+            if entry is None:
+                raise InvalidManifestError(line_num)
+            entries.append(entry)
+    return entries
+
+
+def compute_checksum(
+    crc: BaseCRC,
+    path: Path,
+    read_mode: str = "buffered",
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+) -> T.Tuple[T.Optional[int], T.Optional[int], T.Optional[str]]:
+    """Return the checksum and size of a file, or the status of an error."""
+    try:
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            consume(crc, handle, read_mode=read_mode, queue_depth=queue_depth)
+    except FileNotFoundError:
+        return None, None, STATUS_MISSING
+    except OSError:
+        # directories, unreadable files and the like
+        return None, None, STATUS_ERROR
+    return crc.digest(), size, None
+
+
+def verify_manifest(
+    entries: T.Iterable[ManifestEntry],
+    algorithms: T.Dict[str, BaseCRC],
+    jobs: T.Optional[int] = None,
+    fail_fast: bool = False,
+    read_mode: str = "buffered",
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+) -> T.Iterator[T.Tuple[ManifestEntry, str]]:
+    """Verify manifest entries in parallel, yielding them as they finish.
+
+    Entries referring to the same file and algorithm are hashed once.
+    With fail_fast, pending files are skipped after the first failure.
+    """
+    groups: T.Dict[T.Tuple[Path, str], T.List[ManifestEntry]] = {}
+    for entry in entries:
+        groups.setdefault((entry.path, entry.algorithm), []).append(entry)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                compute_checksum,
+                algorithms[algorithm].copy().reset(),
+                path,
+                read_mode,
+                queue_depth,
+            ): group
+            for (path, algorithm), group in groups.items()
+        }
+        for future in as_completed(futures):
+            checksum, size, error_status = future.result()
+            failed = False
+            for entry in futures[future]:
+                if error_status is not None:
+                    status = error_status
+                elif checksum != entry.checksum:
+                    status = STATUS_FAILED
+                elif entry.size is not None and entry.size != size:
+                    status = STATUS_FAILED
+                else:
+                    status = STATUS_OK
+                failed |= status != STATUS_OK
+                yield entry, status
+
+            if failed and fail_fast:
+                executor.shutdown(wait=False, cancel_futures=True)
+                return
@@ -0,0 +1,133 @@
+import io
+import typing as T
+
+from crcmanip.algorithm import (
+    DEFAULT_CHUNK_SIZE,
+    InvalidPositionError,
+    UnsolvablePatchError,
+    fix_start_end_pos,
+    get_raw_target_checksum,
+)
+from crcmanip.crc import BaseCRC
+from crcmanip.gf2 import solve
+from crcmanip.utils import track_progress
+
+
+class PatchConstraint(T.NamedTuple):
+    start_pos: T.Optional[int]
+    end_pos: T.Optional[int]
+    crc: BaseCRC
+    target_checksum: int
+
+
+def compute_multi_patch(
+    handle: T.IO[bytes],
+    constraints: T.Sequence[PatchConstraint],
+    positions: T.Iterable[int],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> T.Dict[int, int]:
+    """Find byte values for the given positions satisfying all constraints.
+
+    Each constraint requires the checksum of a byte range to equal its
+    target. The patched bytes are overwritten in place, and every range is
+    hashed once with them zeroed. Since the checksums are affine in the
+    patched bits, all constraints are then solved as one linear system over
+    GF(2).
+    """
+    handle.seek(0, io.SEEK_END)
+    file_size = handle.tell()
+    positions = sorted(set(positions))
+    if any(pos < 0 or pos >= file_size for pos in positions):
+        raise InvalidPositionError
+
+    ranges = [
+        fix_start_end_pos(constraint.start_pos, constraint.end_pos, handle)
+        for constraint in constraints
+    ]
+    if any(end_pos > file_size for _start_pos, end_pos in ranges):
+        raise InvalidPositionError
+    crcs = [constraint.crc.copy().reset() for constraint in constraints]
+
+    # hash every range in a single pass over the file
+    pos = min((start_pos for start_pos, _end_pos in ranges), default=0)
+    end_pos = max((end_pos for _start_pos, end_pos in ranges), default=0)
+    handle.seek(pos, io.SEEK_SET)
+    with track_progress(desc="checksum", total=end_pos - pos) as progress:
+        while pos < end_pos:
+            chunk = bytearray(handle.read(min(chunk_size, end_pos - pos)))
+            chunk_end_pos = pos + len(chunk)
+            for patch_pos in positions:
+                if pos <= patch_pos < chunk_end_pos:
+                    chunk[patch_pos - pos] = 0
+            data = bytes(chunk)
+            for crc, (range_start, range_end) in zip(crcs, ranges):
+                if range_start < chunk_end_pos and range_end > pos:
+                    crc.update(
+                        data[
+                            max(range_start, pos)
+                            - pos : min(range_end, chunk_end_pos)
+                            - pos
+                        ]
+                    )
+            pos = chunk_end_pos
+            progress.update(len(chunk))
+
+    # stack the equations of all constraints into one wide bit vector
+    columns = [0] * (len(positions) * 8)
+    target = 0
+    offset = 0
+    for crc, constraint, (range_start, range_end) in zip(
+        crcs, constraints, ranges
+    ):
+        target_checksum = get_raw_target_checksum(
+            crc, constraint.target_checksum, range_end - range_start
+        )
+        target |= (target_checksum ^ crc.raw_value) << offset
+        for num, patch_pos in enumerate(positions):
+            if not range_start <= patch_pos < range_end:
+                continue
+            for bit in range(8):
+                columns[num * 8 + bit] |= (
+                    crc.get_next_zeros_value(
+                        range_end - patch_pos - 1,
+                        crc.lookup_table[1 << bit],
+                    )
+                    << offset
+                )
+        offset += crc.num_bits
+
+    solution = solve(columns, target)
+    if solution is None:
+        raise UnsolvablePatchError
+    return {
+        patch_pos: (solution >> (num * 8)) & 0xFF
+        for num, patch_pos in enumerate(positions)
+    }
+
+
+def apply_multi_patch(
+    input_handle: T.IO[bytes],
+    output_handle: T.IO[bytes],
+    constraints: T.Sequence[PatchConstraint],
+    positions: T.Iterable[int],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    patch = compute_multi_patch(
+        input_handle, constraints, positions, chunk_size=chunk_size
+    )
+
+    input_handle.seek(0, io.SEEK_END)
+    end_pos = input_handle.tell()
+    input_handle.seek(0, io.SEEK_SET)
+    pos = 0
+    with track_progress(desc="output", total=end_pos) as progress:
+        while pos < end_pos:
+            chunk = bytearray(
+                input_handle.read(min(chunk_size, end_pos - pos))
+            )
+            for patch_pos, value in patch.items():
+                if pos <= patch_pos < pos + len(chunk):
+                    chunk[patch_pos - pos] = value
+            output_handle.write(chunk)
+            pos += len(chunk)
+            progress.update(len(chunk))
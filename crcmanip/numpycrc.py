@@ -0,0 +1,53 @@
+import numpy as np
+
+from crcmanip import purecrc
+from crcmanip.crc import BaseCRC, create_lookup_table
+from crcmanip.gf2 import multiply
+
+NUM_LANES = 1024
+MIN_LANE_SIZE = 16
+
+crc_prev = purecrc.crc_prev
+crc_roll = purecrc.crc_roll
+
+
+def crc_next(crc: BaseCRC, source: bytes, value: int) -> int:
+    # Hash many equally sized lanes in lockstep, then chain their states
+    # together by shifting each partial result over the following lane.
+    lane_size = len(source) // NUM_LANES
+    if lane_size < MIN_LANE_SIZE:
+        return purecrc.crc_next(crc, source, value)
+
+    table = np.array(
+        create_lookup_table(crc.polynomial, crc.num_bits, crc.big_endian),
+        dtype=np.uint64,
+    )
+    mask = np.uint64((1 << crc.num_bits) - 1)
+    shift = np.uint64(crc.num_bits - 8)
+    eight = np.uint64(8)
+    columns = (
+        np.frombuffer(source, dtype=np.uint8, count=NUM_LANES * lane_size)
+        .reshape(NUM_LANES, lane_size)
+        .T.astype(np.uint64)
+    )
+
+    states = np.zeros(NUM_LANES, dtype=np.uint64)
+    if crc.big_endian:
+        for column in columns:
+            states = table[(states >> shift) ^ column] ^ (
+                (states << eight) & mask
+            )
+    else:
+        for column in columns:
+            states = table[(states ^ column) & np.uint64(0xFF)] ^ (
+                states >> eight
+            )
+
+    operator = [
+        crc.get_next_zeros_value(lane_size, 1 << bit)
+        for bit in range(crc.num_bits)
+    ]
+    for state in states.tolist():
+        value = multiply(operator, value) ^ state
+
+    return purecrc.crc_next(crc, source[NUM_LANES * lane_size :], value)
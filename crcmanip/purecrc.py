@@ -0,0 +1,136 @@
+import struct
+import typing as T
+from functools import lru_cache
+
+from crcmanip.crc import (
+    BaseCRC,
+    create_lookup_table,
+    create_reverse_lookup_table,
+)
+
+SLICE_SIZE = 8
+
+
+@lru_cache
+def create_slicing_tables(
+    poly: int, num_bits: int, big_endian: bool
+) -> T.Tuple[T.Tuple[int, ...], ...]:
+    """Tables for the effect of a byte followed by 0..7 zero bytes."""
+    table = create_lookup_table(poly, num_bits, big_endian)
+    mask = (1 << num_bits) - 1
+    shift = num_bits - 8
+    tables = [table]
+    for _i in range(SLICE_SIZE - 1):
+        prev = tables[-1]
+        if big_endian:
+            tables.append(
+                tuple(
+                    table[(val >> shift) & 0xFF] ^ ((val << 8) & mask)
+                    for val in prev
+                )
+            )
+        else:
+            tables.append(
+                tuple(table[val & 0xFF] ^ (val >> 8) for val in prev)
+            )
+    return tuple(reversed(tables))
+
+
+def crc_next(crc: BaseCRC, source: bytes, value: int) -> int:
+    tables = create_slicing_tables(
+        crc.polynomial, crc.num_bits, crc.big_endian
+    )
+    table = tables[-1]
+    t0, t1, t2, t3, t4, t5, t6, t7 = tables
+    mask = (1 << crc.num_bits) - 1
+    num_words = len(source) // SLICE_SIZE
+    tail = source[num_words * SLICE_SIZE :]
+    words = memoryview(source)[: num_words * SLICE_SIZE]
+
+    if crc.big_endian:
+        shift = crc.num_bits - 8
+        top = SLICE_SIZE * 8 - crc.num_bits
+        for (word,) in struct.iter_unpack(">Q", words):
+            word ^= value << top
+            value = (
+                t0[word >> 56]
+                ^ t1[(word >> 48) & 0xFF]
+                ^ t2[(word >> 40) & 0xFF]
+                ^ t3[(word >> 32) & 0xFF]
+                ^ t4[(word >> 24) & 0xFF]
+                ^ t5[(word >> 16) & 0xFF]
+                ^ t6[(word >> 8) & 0xFF]
+                ^ t7[word & 0xFF]
+            )
+        for char in tail:
+            value = table[char ^ (value >> shift)] ^ ((value << 8) & mask)
+    else:
+        for (word,) in struct.iter_unpack("<Q", words):
+            word ^= value
+            value = (
+                t0[word & 0xFF]
+                ^ t1[(word >> 8) & 0xFF]
+                ^ t2[(word >> 16) & 0xFF]
+                ^ t3[(word >> 24) & 0xFF]
+                ^ t4[(word >> 32) & 0xFF]
+                ^ t5[(word >> 40) & 0xFF]
+                ^ t6[(word >> 48) & 0xFF]
+                ^ t7[word >> 56]
+            )
+        for char in tail:
+            value = table[(char ^ value) & 0xFF] ^ (value >> 8)
+
+    return value & mask
+
+
+def crc_prev(crc: BaseCRC, source: bytes, value: int) -> int:
+    table = create_reverse_lookup_table(
+        crc.polynomial, crc.num_bits, crc.big_endian
+    )
+    mask = (1 << crc.num_bits) - 1
+    shift = crc.num_bits - 8
+
+    if crc.big_endian:
+        for char in reversed(source):
+            value = (
+                (char << shift)
+                ^ table[value & 0xFF]
+                ^ (value << shift)
+                ^ (value >> 8)
+            ) & mask
+    else:
+        for char in reversed(source):
+            value = (char ^ table[value >> shift] ^ (value << 8)) & mask
+
+    return value
+
+
+def crc_roll(
+    crc: BaseCRC,
+    source: bytes,
+    value: int,
+    window_size: int,
+    out_table: T.Tuple[int, ...],
+    targets: T.Tuple[int, ...],
+) -> T.Tuple[int, T.List[int]]:
+    table = create_lookup_table(crc.polynomial, crc.num_bits, crc.big_endian)
+    mask = (1 << crc.num_bits) - 1
+    shift = crc.num_bits - 8
+    target_set = set(targets)
+    offsets: T.List[int] = []
+
+    pairs = zip(source, memoryview(source)[window_size:])
+    if crc.big_endian:
+        for offset, (old, char) in enumerate(pairs, 1):
+            value ^= out_table[old]
+            value = table[char ^ (value >> shift)] ^ ((value << 8) & mask)
+            if value in target_set:
+                offsets.append(offset)
+    else:
+        for offset, (old, char) in enumerate(pairs, 1):
+            value ^= out_table[old]
+            value = table[(char ^ value) & 0xFF] ^ (value >> 8)
+            if value in target_set:
+                offsets.append(offset)
+
+    return value, offsets
@@ -0,0 +1,188 @@
+import errno
+import io
+import mmap
+import os
+import queue
+import threading
+import typing as T
+
+READ_MODES = ["buffered", "dontneed", "direct"]
+DIRECT_IO_ALIGNMENT = 4096
+DEFAULT_QUEUE_DEPTH = 2
+
+END_OF_CHUNKS = object()
+
+
+class ChunkReader:
+    """Read chunks of a file, optionally keeping them out of the page cache.
+
+    In "dontneed" mode the pages are dropped from the cache once read, and
+    the chunk read next is announced to the kernel so that it is fetched in
+    the background. In "direct" mode the file is read with O_DIRECT into
+    aligned buffers. Where the platform or the file system does not support
+    these, the reader falls back to regular reads.
+    """
+
+    def __init__(
+        self, handle: T.IO[bytes], read_mode: str = "buffered"
+    ) -> None:
+        self.handle = handle
+        self.read_mode = read_mode
+        self.fd = -1
+        self.orig_flags: T.Optional[int] = None
+        self.buffer: T.Optional[mmap.mmap] = None
+        self.chunks: T.Optional[T.Generator[bytes, None, None]] = None
+
+        if read_mode == "buffered" or not hasattr(os, "posix_fadvise"):
+            self.read_mode = "buffered"
+            return
+        try:
+            self.fd = handle.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self.read_mode = "buffered"
+            return
+
+        if read_mode == "direct":
+            try:
+                import fcntl
+
+                flags = fcntl.fcntl(self.fd, fcntl.F_GETFL)
+                fcntl.fcntl(self.fd, fcntl.F_SETFL, flags | os.O_DIRECT)
+                self.orig_flags = flags
+            except (AttributeError, ImportError, OSError):
+                self.read_mode = "dontneed"
+
+    def __enter__(self) -> "ChunkReader":
+        return self
+
+    def __exit__(self, *_args: T.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # stop reading ahead before the flags and the buffer go away
+        if self.chunks is not None:
+            self.chunks.close()
+            self.chunks = None
+        self.restore_flags()
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def restore_flags(self) -> None:
+        if self.orig_flags is not None:
+            import fcntl
+
+            fcntl.fcntl(self.fd, fcntl.F_SETFL, self.orig_flags)
+            self.orig_flags = None
+
+    def prefetch(self, pos: int, size: int) -> None:
+        if self.read_mode == "dontneed" and size > 0:
+            os.posix_fadvise(self.fd, pos, size, os.POSIX_FADV_WILLNEED)
+
+    def read(self, pos: int, size: int) -> bytes:
+        if self.read_mode == "direct":
+            try:
+                return self.read_direct(pos, size)
+            except OSError as ex:
+                if ex.errno != errno.EINVAL:
+                    raise
+                # the file system does not support unbuffered reads
+                self.restore_flags()
+                self.read_mode = "dontneed"
+
+        self.handle.seek(pos, io.SEEK_SET)
+        chunk = self.handle.read(size)
+        if self.read_mode == "dontneed":
+            os.posix_fadvise(self.fd, pos, size, os.POSIX_FADV_DONTNEED)
+        return chunk
+
+    def read_direct(self, pos: int, size: int) -> bytes:
+        # O_DIRECT needs the offset, the size and the buffer to be aligned;
+        # anonymous maps are always page aligned
+        aligned_pos = pos - pos % DIRECT_IO_ALIGNMENT
+        aligned_size = -(-(pos + size - aligned_pos) // DIRECT_IO_ALIGNMENT)
+        aligned_size *= DIRECT_IO_ALIGNMENT
+        if self.buffer is None or len(self.buffer) < aligned_size:
+            if self.buffer is not None:
+                self.buffer.close()
+            self.buffer = mmap.mmap(-1, aligned_size)
+
+        end_pos = pos - aligned_pos + size
+        with memoryview(self.buffer)[:aligned_size] as view:
+            # reads may come up short before the end of file, for example on
+            # network file systems; resume from the last aligned position
+            num_read = 0
+            while num_read < end_pos:
+                offset = num_read - num_read % DIRECT_IO_ALIGNMENT
+                with view[offset:] as target:
+                    result = os.preadv(self.fd, [target], aligned_pos + offset)
+                if offset + result <= num_read:
+                    break  # end of file
+                num_read = offset + result
+            return bytes(
+                view[min(pos - aligned_pos, num_read) : min(end_pos, num_read)]
+            )
+
+    def read_chunks(
+        self, chunks: T.Iterable[T.Tuple[int, int]], queue_depth: int = 0
+    ) -> T.Iterator[bytes]:
+        """Read the given (pos, size) chunks in order.
+
+        With a positive queue depth, a background thread reads up to that
+        many chunks ahead, so that reading overlaps with hashing. The thread
+        is stopped when the reader is closed.
+        """
+        if queue_depth > 0:
+            self.chunks = self._read_chunks_threaded(chunks, queue_depth)
+        else:
+            self.chunks = self._read_chunks(chunks)
+        return self.chunks
+
+    def _read_chunks(
+        self, chunks: T.Iterable[T.Tuple[int, int]]
+    ) -> T.Generator[bytes, None, None]:
+        chunk_iter = iter(chunks)
+        chunk = next(chunk_iter, None)
+        while chunk is not None:
+            next_chunk = next(chunk_iter, None)
+            data = self.read(*chunk)
+            if next_chunk is not None:
+                self.prefetch(*next_chunk)
+            yield data
+            chunk = next_chunk
+
+    def _read_chunks_threaded(
+        self, chunks: T.Iterable[T.Tuple[int, int]], queue_depth: int
+    ) -> T.Generator[bytes, None, None]:
+        results: "queue.Queue[T.Any]" = queue.Queue(maxsize=queue_depth)
+        stop = threading.Event()
+
+        def worker() -> None:
+            try:
+                for data in self._read_chunks(chunks):
+                    results.put(data)
+                    if stop.is_set():
+                        return
+                results.put(END_OF_CHUNKS)
+            except BaseException as ex:
+                results.put(ex)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is END_OF_CHUNKS:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # unblock the worker if the chunks were not read to the end
+            stop.set()
+            try:
+                while True:
+                    results.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join()
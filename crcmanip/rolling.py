@@ -0,0 +1,102 @@
+import typing as T
+from functools import lru_cache
+
+from crcmanip.algorithm import (
+    DEFAULT_CHUNK_SIZE,
+    fix_start_end_pos,
+    get_raw_target_checksum,
+)
+from crcmanip.backends import get_backend
+from crcmanip.crc import BaseCRC, create_lookup_table
+from crcmanip.utils import track_progress
+
+
+@lru_cache
+def create_rolling_table(
+    crc_cls: T.Type[BaseCRC], window_size: int
+) -> T.Tuple[int, ...]:
+    """Table for the effect of the byte leaving a window of a given size.
+
+    Entries are the CRC contribution of a byte followed by window_size - 1
+    zero bytes; they are linear in the byte, so only eight shifts are
+    computed.
+    """
+    crc = crc_cls()
+    table = create_lookup_table(crc.polynomial, crc.num_bits, crc.big_endian)
+    basis = [
+        crc.get_next_zeros_value(window_size - 1, table[1 << bit])
+        for bit in range(8)
+    ]
+    out_table = [0] * 0x100
+    for num in range(1, 0x100):
+        lowest_bit = (num & -num).bit_length() - 1
+        out_table[num] = out_table[num & (num - 1)] ^ basis[lowest_bit]
+    return tuple(out_table)
+
+
+def get_window_targets(
+    crc: BaseCRC, window_size: int, target_checksums: T.Iterable[int]
+) -> T.Tuple[int, ...]:
+    # convert the digests to raw values computed from a zero initial state,
+    # which is what the rolling kernel keeps track of
+    initial_value = crc.get_next_zeros_value(window_size, crc.initial_xor)
+    return tuple(
+        sorted(
+            {
+                get_raw_target_checksum(crc, checksum, window_size)
+                ^ initial_value
+                for checksum in target_checksums
+            }
+        )
+    )
+
+
+def find_windows(
+    crc: BaseCRC,
+    handle: T.IO[bytes],
+    window_size: int,
+    target_checksums: T.Iterable[int],
+    start_pos: T.Optional[int] = None,
+    end_pos: T.Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> T.Iterator[int]:
+    """Yield every offset where a window has one of the target checksums.
+
+    The window CRC is updated in constant time per byte by removing the
+    contribution of the byte leaving the window, so the scan is linear in
+    the input size regardless of the window size.
+    """
+    assert window_size > 0
+    start_pos, end_pos = fix_start_end_pos(start_pos, end_pos, handle)
+    if end_pos - start_pos < window_size:
+        return
+
+    out_table = create_rolling_table(type(crc), window_size)
+    targets = get_window_targets(crc, window_size, target_checksums)
+    crc_roll = get_backend().crc_roll
+    # keep the chunks at least as large as the window so that carrying the
+    # previous window over stays linear
+    chunk_size = max(chunk_size, window_size)
+
+    with track_progress(desc="search", total=end_pos - start_pos) as progress:
+        handle.seek(start_pos)
+        window = handle.read(window_size)
+        progress.update(window_size)
+        value = crc.get_next_value(window, 0)
+        if value in targets:
+            yield start_pos
+
+        pos = start_pos
+        remaining = end_pos - start_pos - window_size
+        while remaining:
+            chunk = handle.read(min(chunk_size, remaining))
+            data = window + chunk
+            value, offsets = crc_roll(
+                crc, data, value, window_size, out_table, targets
+            )
+            for offset in offsets:
+                yield pos + offset
+            pos += len(chunk)
+            remaining -= len(chunk)
+            progress.update(len(chunk))
+            window = data[-window_size:]
@@ -0,0 +1,144 @@
+import json
+import os
+import socketserver
+import threading
+import typing as T
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from crcmanip.algorithm import CHARSETS, consume, patch_file
+from crcmanip.crc import BaseCRC
+
+
+class RequestError(ValueError):
+    pass
+
+
+def run_calc(crc: BaseCRC, request: T.Dict[str, T.Any]) -> str:
+    with Path(request["path"]).open("rb") as handle:
+        consume(crc, handle)
+    return crc.hex_digest()
+
+
+def run_patch(crc: BaseCRC, request: T.Dict[str, T.Any]) -> str:
+    input_path = Path(request["path"])
+    output_path = request.get("output")
+    charset = request.get("charset")
+    if charset is not None and charset not in CHARSETS:
+        raise RequestError(f"unknown charset: {charset}")
+    if request.get("patch_size") is not None and charset is None:
+        raise RequestError("patch_size needs a charset")
+
+    patch_file(
+        crc,
+        int(request["checksum"], 16),
+        input_path,
+        Path(output_path) if output_path else None,
+        backup=bool(request.get("backup", False)),
+        overwrite=bool(request.get("overwrite", False)),
+        target_pos=request.get("pos"),
+        charset=CHARSETS[charset] if charset else None,
+        patch_size=request.get("patch_size"),
+    )
+    return str(output_path or input_path)
+
+
+COMMANDS: T.Dict[str, T.Callable[[BaseCRC, T.Dict[str, T.Any]], str]] = {
+    "calc": run_calc,
+    "patch": run_patch,
+}
+
+
+def run_request(
+    algorithms: T.Dict[str, BaseCRC], request: T.Dict[str, T.Any]
+) -> T.Dict[str, T.Any]:
+    response: T.Dict[str, T.Any] = {"id": request.get("id")}
+    try:
+        command = COMMANDS.get(request.get("command", ""))
+        if command is None:
+            raise RequestError(f"unknown command: {request.get('command')}")
+        algorithm = request.get("algorithm", list(algorithms.keys())[0])
+        if algorithm not in algorithms:
+            raise RequestError(f"unknown algorithm: {algorithm}")
+        # the engines are shared between workers, so hash with a copy
+        crc = algorithms[algorithm].copy().reset()
+        response["result"] = command(crc, request)
+    except (KeyError, TypeError, ValueError, OSError) as ex:
+        response["error"] = str(ex)
+    return response
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    server: "Server"
+
+    def setup(self) -> None:
+        super().setup()
+        self.lock = threading.Lock()
+
+    def send(self, response: T.Dict[str, T.Any]) -> None:
+        with self.lock:
+            try:
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+            except OSError:
+                pass  # the client went away
+
+    def run(self, request: T.Dict[str, T.Any]) -> None:
+        self.send(run_request(self.server.algorithms, request))
+
+    def handle(self) -> None:
+        futures: T.List[Future[None]] = []
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise RequestError("request must be an object")
+            except ValueError as ex:
+                self.send({"id": None, "error": str(ex)})
+                continue
+
+            futures.append(self.server.executor.submit(self.run, request))
+
+        for future in futures:
+            future.result()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: Path,
+        algorithms: T.Dict[str, BaseCRC],
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        self.algorithms = algorithms
+        self.executor = executor
+        super().__init__(str(socket_path), RequestHandler)
+
+
+def serve(
+    socket_path: Path,
+    algorithms: T.Dict[str, BaseCRC],
+    jobs: T.Optional[int] = None,
+    ready: T.Optional[T.Callable[[Server], None]] = None,
+) -> None:
+    """Answer JSON-lines calc and patch requests on a Unix socket.
+
+    Each request is run on a shared worker pool and its response is sent
+    as soon as it finishes, tagged with the "id" from the request.
+    """
+    if socket_path.is_socket():
+        socket_path.unlink()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor, Server(
+        socket_path, algorithms, executor
+    ) as server:
+        if ready:
+            ready(server)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
@@ -1,15 +1,24 @@
 import io
 import typing as T
+from pathlib import Path
 
 import pytest
 
 from crcmanip.algorithm import (
+    CHARSETS,
     InvalidPositionError,
+    UnseekableOutputError,
+    UnsolvablePatchError,
     apply_patch,
+    compute_constrained_patch,
     compute_patch,
     consume,
     consume_reverse,
+    get_constrained_patch_size,
+    get_regions,
+    stream_patch,
 )
+from crcmanip.checkpoint import Checkpoint
 from crcmanip.crc import BaseCRC
 
 
@@ -63,6 +72,101 @@ def test_consume_reverse(
         assert crc.digest() == expected_digest
 
 
+@pytest.fixture
+def sparse_file(tmp_path: Path) -> Path:
+    ret = tmp_path / "sparse.bin"
+    with ret.open("wb") as handle:
+        handle.seek(1024 * 1024)
+        handle.write(b"123456789")
+        handle.seek(3 * 1024 * 1024)
+        handle.write(b"123456789")
+        handle.truncate(4 * 1024 * 1024)
+    return ret
+
+
+def test_get_regions_no_fileno() -> None:
+    with io.BytesIO(b"123456789") as handle:
+        assert get_regions(handle, 1, 12) == [(1, 12, False)]
+
+
+def test_get_regions(sparse_file: Path) -> None:
+    with sparse_file.open("rb") as handle:
+        regions = get_regions(handle, 0, 5 * 1024 * 1024)
+
+    assert regions[0][0] == 0
+    assert regions[-1] == (4 * 1024 * 1024, 5 * 1024 * 1024, False)
+    for (_start1, end1, _hole1), (start2, _end2, _hole2) in zip(
+        regions, regions[1:]
+    ):
+        assert end1 == start2
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("start_pos", [None, 1, 1024 * 1024 + 3])
+@pytest.mark.parametrize("end_pos", [None, 1024 * 1024 + 5, 5 * 1024 * 1024])
+def test_consume_sparse(
+    crc_cls: T.Type[BaseCRC],
+    sparse_file: Path,
+    start_pos: T.Optional[int],
+    end_pos: T.Optional[int],
+) -> None:
+    test_string = sparse_file.read_bytes()
+
+    crc = crc_cls()
+    with sparse_file.open("rb") as handle:
+        consume(crc, handle, start_pos, end_pos)
+    assert (
+        crc.digest()
+        == crc_cls().update(test_string[start_pos:end_pos]).digest()
+    )
+
+    crc = crc_cls()
+    with sparse_file.open("rb") as handle:
+        consume_reverse(crc, handle, start_pos, end_pos)
+    assert crc.digest() == (
+        crc_cls().update_reverse(test_string[start_pos:end_pos]).digest()
+    )
+
+
+class FlakyBytesIO(io.BytesIO):
+    def __init__(self, data: bytes, max_reads: int) -> None:
+        super().__init__(data)
+        self.reads = 0
+        self.max_reads = max_reads
+
+    def read(self, size: T.Optional[int] = -1) -> bytes:
+        self.reads += 1
+        if self.reads > self.max_reads:
+            raise OSError("connection lost")
+        return super().read(size)
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("reverse", (False, True))
+def test_consume_checkpoint(
+    crc_cls: T.Type[BaseCRC], reverse: bool, tmp_path: Path
+) -> None:
+    test_string = b"123456789" * 100
+    func = consume_reverse if reverse else consume
+    checkpoint = Checkpoint(tmp_path / "ckpt", {}, interval=100)
+
+    crc = crc_cls()
+    with FlakyBytesIO(test_string, max_reads=50) as handle:
+        with pytest.raises(OSError):
+            func(crc, handle, 1, None, chunk_size=9, checkpoint=checkpoint)
+
+    crc = crc_cls()
+    with FlakyBytesIO(test_string, max_reads=60) as handle:
+        func(crc, handle, 1, None, chunk_size=9, checkpoint=checkpoint)
+
+    expected_crc = crc_cls()
+    with io.BytesIO(test_string) as handle:
+        func(expected_crc, handle, 1, None)
+
+    assert crc.raw_value == expected_crc.raw_value
+    assert crc.digest() == expected_crc.digest()
+
+
 @pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
 @pytest.mark.parametrize("overwrite", (False, True))
 @pytest.mark.parametrize("target_pos", [0, 100, 896, 897, 898, 899, 900])
@@ -142,3 +246,142 @@ def test_apply_patch_invalid_pos(any_crc: BaseCRC) -> None:
             apply_patch(
                 any_crc, 0x00000000, input_handle, output_handle, 4, False
             )
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("charset", CHARSETS.values())
+@pytest.mark.parametrize("overwrite", (False, True))
+@pytest.mark.parametrize("target_pos", [0, 100, 896, 900])
+def test_apply_patch_charset(
+    crc_cls: T.Type[BaseCRC],
+    charset: bytes,
+    overwrite: bool,
+    target_pos: int,
+) -> None:
+    test_string = b"123456789" * 100
+    test_digest = 0xDEADBEEF & ((1 << crc_cls.num_bits) - 1)
+    patch_size = get_constrained_patch_size(crc_cls(), charset)
+
+    with io.BytesIO() as input_handle, io.BytesIO() as output_handle:
+        input_handle.write(test_string)
+
+        apply_patch(
+            crc_cls(),
+            test_digest,
+            input_handle,
+            output_handle,
+            target_pos=target_pos,
+            overwrite=overwrite,
+            charset=charset,
+        )
+
+        actual_output = output_handle.getvalue()
+        actual_digest = crc_cls().update(actual_output).digest()
+        assert actual_digest == test_digest
+        assert set(actual_output[target_pos : target_pos + patch_size]) <= (
+            set(charset)
+        )
+
+
+def test_compute_constrained_patch_unsolvable(any_crc: BaseCRC) -> None:
+    with io.BytesIO() as handle:
+        handle.write(b"123")
+        with pytest.raises(UnsolvablePatchError):
+            compute_constrained_patch(
+                any_crc, handle, 0x00000000, 3, False, charset=b"a"
+            )
+        with pytest.raises(UnsolvablePatchError):
+            compute_constrained_patch(
+                any_crc, handle, 0x00000000, 3, False, b"01", patch_size=1
+            )
+
+
+class UnseekableBytesIO(io.BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("overwrite", (False, True))
+@pytest.mark.parametrize("target_pos", [None, 0, 100, 896, 897, 900])
+@pytest.mark.parametrize("chunk_size", [1, 9, 100])
+def test_stream_patch(
+    crc_cls: T.Type[BaseCRC],
+    overwrite: bool,
+    target_pos: T.Optional[int],
+    chunk_size: int,
+) -> None:
+    test_string = b"123456789" * 100
+    test_digest = 0xDEADBEEF & ((1 << crc_cls.num_bits) - 1)
+
+    with io.BytesIO(
+        test_string
+    ) as input_handle, io.BytesIO() as output_handle:
+        stream_patch(
+            crc_cls(),
+            test_digest,
+            input_handle,
+            output_handle,
+            target_pos=target_pos,
+            overwrite=overwrite,
+            chunk_size=chunk_size,
+        )
+        actual_output = output_handle.getvalue()
+
+    with io.BytesIO(
+        test_string
+    ) as input_handle, io.BytesIO() as output_handle:
+        apply_patch(
+            crc_cls(),
+            test_digest,
+            input_handle,
+            output_handle,
+            target_pos=len(test_string) if target_pos is None else target_pos,
+            overwrite=overwrite if target_pos is not None else False,
+        )
+        expected_output = output_handle.getvalue()
+
+    assert actual_output == expected_output
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("target_pos", [None, 0, 100])
+def test_stream_patch_charset(
+    crc_cls: T.Type[BaseCRC], target_pos: T.Optional[int]
+) -> None:
+    test_string = b"123456789" * 100
+    test_digest = 0xDEADBEEF & ((1 << crc_cls.num_bits) - 1)
+    charset = CHARSETS["base64"]
+
+    with io.BytesIO(
+        test_string
+    ) as input_handle, io.BytesIO() as output_handle:
+        stream_patch(
+            crc_cls(),
+            test_digest,
+            input_handle,
+            output_handle,
+            target_pos=target_pos,
+            charset=charset,
+        )
+        actual_output = output_handle.getvalue()
+
+    assert crc_cls().update(actual_output).digest() == test_digest
+    assert set(actual_output) <= set(test_string) | set(charset)
+
+
+def test_stream_patch_unseekable_output(any_crc: BaseCRC) -> None:
+    with io.BytesIO(b"123") as input_handle, UnseekableBytesIO() as output:
+        stream_patch(any_crc, 0x00000000, input_handle, output)
+        assert len(output.getvalue()) == 3 + any_crc.num_bytes
+
+        with pytest.raises(UnseekableOutputError):
+            stream_patch(any_crc, 0x00000000, input_handle, output, 0)
+
+
+def test_stream_patch_invalid_pos(any_crc: BaseCRC) -> None:
+    with io.BytesIO(b"123") as input_handle, io.BytesIO() as output_handle:
+        with pytest.raises(InvalidPositionError):
+            stream_patch(any_crc, 0x00000000, input_handle, output_handle, -1)
+        with pytest.raises(InvalidPositionError):
+            stream_patch(any_crc, 0x00000000, input_handle, output_handle, 4)
@@ -0,0 +1,170 @@
+import io
+import os
+import tarfile
+import typing as T
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from crcmanip.archive import (
+    ArchiveMember,
+    CorruptArchiveError,
+    InvalidArchiveError,
+    checksum_archive,
+)
+from crcmanip.crc import CRC16IBM, CRC32
+
+MEMBERS = {"a.txt": b"hello", "dir/b.txt": b"xxhelloyy" * 1000}
+
+
+def expected_members(crc_cls: T.Type[CRC32]) -> T.List[ArchiveMember]:
+    return [
+        ArchiveMember(name, len(data), crc_cls().update(data).digest())
+        for name, data in MEMBERS.items()
+    ]
+
+
+@pytest.fixture
+def src_dir(tmp_path: Path) -> Path:
+    ret = tmp_path / "src"
+    for name, data in MEMBERS.items():
+        (ret / name).parent.mkdir(parents=True, exist_ok=True)
+        (ret / name).write_bytes(data)
+    return ret
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz", "w:bz2", "w:xz"])
+@pytest.mark.parametrize("crc_cls", [CRC32, CRC16IBM])
+def test_checksum_tar(
+    src_dir: Path, tmp_path: Path, mode: str, crc_cls: T.Type[CRC32]
+) -> None:
+    path = tmp_path / "archive.tar"
+    with tarfile.open(path, mode) as archive:
+        for name in MEMBERS:
+            archive.add(src_dir / name, arcname=name)
+
+    actual = list(checksum_archive(crc_cls(), path, chunk_size=100))
+
+    assert actual == expected_members(crc_cls)
+
+
+@pytest.mark.parametrize(
+    "compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED]
+)
+def test_checksum_zip(tmp_path: Path, compression: int) -> None:
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w", compression) as archive:
+        archive.writestr("dir/", b"")
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+
+    actual = list(checksum_archive(CRC32(), path, chunk_size=100))
+
+    assert actual == expected_members(CRC32)
+
+
+def test_checksum_zip_bad_crc(tmp_path: Path) -> None:
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    path.write_bytes(path.read_bytes().replace(b"hello", b"jello", 1))
+
+    actual = list(checksum_archive(CRC32(), path))
+
+    assert actual == [
+        ArchiveMember("a.txt", 5, None),
+        expected_members(CRC32)[1],
+    ]
+
+
+def test_checksum_zip_corrupt_data(tmp_path: Path) -> None:
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("dir/b.txt")
+    with path.open("r+b") as handle:
+        # damage the deflate stream right after the local file header
+        handle.seek(info.header_offset + 30 + len(info.filename))
+        handle.write(b"\xff" * 4)
+
+    actual = list(checksum_archive(CRC32(), path))
+
+    assert actual == [
+        expected_members(CRC32)[0],
+        ArchiveMember("dir/b.txt", len(MEMBERS["dir/b.txt"]), None),
+    ]
+
+
+def test_checksum_zip_encrypted(tmp_path: Path) -> None:
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("a.txt")
+    raw = bytearray(path.read_bytes())
+    # mark the member as encrypted in its central directory entry
+    central_offset = raw.index(b"PK\x01\x02")
+    raw[central_offset + 8] |= 0x1
+    raw[info.header_offset + 6] |= 0x1
+    path.write_bytes(raw)
+
+    actual = list(checksum_archive(CRC32(), path))
+
+    assert actual == [
+        ArchiveMember("a.txt", 5, None),
+        expected_members(CRC32)[1],
+    ]
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz", "w:xz"])
+def test_checksum_tar_truncated(tmp_path: Path, mode: str) -> None:
+    path = tmp_path / "archive.tar"
+    with tarfile.open(path, mode) as archive:
+        info = tarfile.TarInfo("a.txt")
+        info.size = 100_000
+        archive.addfile(info, io.BytesIO(os.urandom(info.size)))
+    path.write_bytes(path.read_bytes()[: path.stat().st_size // 2])
+
+    with pytest.raises(CorruptArchiveError):
+        list(checksum_archive(CRC32(), path))
+
+
+@pytest.mark.parametrize(
+    "mode,damage",
+    [
+        # flip bits inside the compressed payload
+        (
+            "w:gz",
+            lambda raw: raw[:200]
+            + bytes(byte ^ 0xFF for byte in raw[200:400])
+            + raw[400:],
+        ),
+        # drop the stream footer, which follows the last tar block
+        ("w:xz", lambda raw: raw[:-30]),
+    ],
+)
+def test_checksum_tar_corrupt(
+    tmp_path: Path, mode: str, damage: T.Callable[[bytes], bytes]
+) -> None:
+    path = tmp_path / "archive.tar"
+    with tarfile.open(path, mode) as archive:
+        info = tarfile.TarInfo("x.bin")
+        info.size = 200_000
+        archive.addfile(info, io.BytesIO(os.urandom(info.size)))
+    path.write_bytes(damage(path.read_bytes()))
+
+    with pytest.raises(CorruptArchiveError):
+        list(checksum_archive(CRC32(), path))
+
+
+def test_checksum_archive_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"hello")
+
+    with pytest.raises(InvalidArchiveError):
+        checksum_archive(CRC32(), path)
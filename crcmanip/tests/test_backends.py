@@ -0,0 +1,105 @@
+import os
+import typing as T
+from unittest import mock
+
+import pytest
+
+from crcmanip import backends
+from crcmanip.crc import BaseCRC
+from crcmanip.rolling import create_rolling_table
+
+
+@pytest.fixture(autouse=True)
+def restore_backend() -> T.Iterator[None]:
+    old_backend = backends.ACTIVE_BACKEND
+    yield
+    backends.ACTIVE_BACKEND = old_backend
+
+
+def test_get_available_backends() -> None:
+    available_backends = backends.get_available_backends()
+    assert "python" in available_backends
+    assert available_backends == [
+        backend
+        for backend in backends.BACKEND_MODULES
+        if backend in available_backends
+    ]
+
+
+def test_get_backend_name_default() -> None:
+    backends.ACTIVE_BACKEND = None
+    assert backends.get_backend_name() == backends.get_available_backends()[0]
+
+
+def test_get_backend_name_default_lazy() -> None:
+    backends.ACTIVE_BACKEND = None
+    with mock.patch.object(
+        backends, "load_backend", side_effect=lambda name: name != "fast"
+    ) as mock_load_backend:
+        assert backends.get_backend_name() == "numpy"
+    assert [call.args for call in mock_load_backend.call_args_list] == [
+        ("fast",),
+        ("numpy",),
+    ]
+
+
+def test_set_backend() -> None:
+    backends.set_backend("python")
+    assert backends.get_backend_name() == "python"
+    assert backends.get_backend() is backends.load_backend("python")
+
+
+@pytest.mark.parametrize("name", ["bogus", "unavailable"])
+def test_set_backend_unavailable(name: str) -> None:
+    backends.BACKEND_MODULES["unavailable"] = "crcmanip.nonexistent"
+    try:
+        with pytest.raises(backends.UnavailableBackendError):
+            backends.set_backend(name)
+    finally:
+        del backends.BACKEND_MODULES["unavailable"]
+
+
+@pytest.mark.parametrize("backend", backends.get_available_backends())
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("size", [0, 1, 7, 8, 9, 17, 64 * 1024 + 3])
+def test_backend(backend: str, crc_cls: T.Type[BaseCRC], size: int) -> None:
+    test_string = os.urandom(size)
+    crc = crc_cls()
+    reference = backends.load_backend("python")
+    module = backends.load_backend(backend)
+    assert reference
+    assert module
+
+    for value in [0, 0x1234, crc.initial_xor]:
+        assert module.crc_next(crc, test_string, value) == reference.crc_next(
+            crc, test_string, value
+        )
+        assert module.crc_prev(crc, test_string, value) == reference.crc_prev(
+            crc, test_string, value
+        )
+
+
+@pytest.mark.parametrize("backend", backends.get_available_backends())
+def test_backend_digest(backend: str, any_crc: BaseCRC) -> None:
+    backends.set_backend(backend)
+    assert any_crc.update(b"123456789").hex_digest() == "CBF43926"
+    assert any_crc.reset().update_reverse(b"123456789").digest() == 0x9A7AC8DB
+
+
+@pytest.mark.parametrize("backend", backends.get_available_backends())
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+def test_backend_roll(backend: str, crc_cls: T.Type[BaseCRC]) -> None:
+    test_string = b"123456789" * 50
+    window_size = 9
+    crc = crc_cls()
+    out_table = create_rolling_table(crc_cls, window_size)
+    value = crc.get_next_value(test_string[:window_size], 0)
+    module = backends.load_backend(backend)
+    assert module
+
+    actual_value, actual_offsets = module.crc_roll(
+        crc, test_string, value, window_size, out_table, (value, 0, 1)
+    )
+
+    assert actual_value == value
+    assert actual_offsets == list(range(9, len(test_string) - 8, 9))
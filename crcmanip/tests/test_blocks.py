@@ -0,0 +1,35 @@
+import io
+import typing as T
+
+import pytest
+
+from crcmanip.blocks import checksum_blocks
+from crcmanip.crc import BaseCRC
+
+TEST_STRING = b"hello123456789" * 100
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("block_size", [1, 7, 100, 1400, 2000])
+@pytest.mark.parametrize("chunk_size", [1, 64, 10000])
+def test_checksum_blocks(
+    crc_cls: T.Type[BaseCRC], block_size: int, chunk_size: int
+) -> None:
+    crc = crc_cls()
+    with io.BytesIO(TEST_STRING) as handle:
+        checksums = checksum_blocks(
+            crc, handle, block_size, chunk_size=chunk_size
+        )
+
+    assert checksums == [
+        crc_cls().update(TEST_STRING[pos : pos + block_size]).digest()
+        for pos in range(0, len(TEST_STRING), block_size)
+    ]
+    assert crc.consumed == len(TEST_STRING)
+    assert crc.digest() == crc_cls().update(TEST_STRING).digest()
+
+
+def test_checksum_blocks_empty(any_crc: BaseCRC) -> None:
+    with io.BytesIO() as handle:
+        assert checksum_blocks(any_crc, handle, 10) == []
+    assert any_crc.digest() == type(any_crc)().digest()
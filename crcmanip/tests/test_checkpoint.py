@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from crcmanip.checkpoint import Checkpoint, get_checkpoint
+
+
+def test_checkpoint(tmp_path: Path) -> None:
+    path = tmp_path / "file.ckpt"
+    checkpoint = Checkpoint(path, {"size": 1})
+    assert checkpoint.load("key") is None
+
+    checkpoint.save("key", 1, 2, 3)
+    assert checkpoint.load("key") == (1, 2, 3)
+    assert Checkpoint(path, {"size": 1}).load("key") == (1, 2, 3)
+    assert Checkpoint(path, {"size": 2}).load("key") is None
+
+    checkpoint.remove()
+    assert not path.exists()
+    assert checkpoint.load("key") is None
+    checkpoint.remove()
+
+
+def test_checkpoint_corrupt(tmp_path: Path) -> None:
+    path = tmp_path / "file.ckpt"
+    path.write_text("{")
+    assert Checkpoint(path, {}).load("key") is None
+
+
+def test_get_checkpoint(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("hello")
+
+    checkpoint = get_checkpoint(path, "CRC32", interval=5)
+    assert checkpoint.path == tmp_path / "file.txt.ckpt"
+    assert checkpoint.interval == 5
+    assert checkpoint.identity["algorithm"] == "CRC32"
+    assert checkpoint.identity["size"] == 5
@@ -1,11 +1,26 @@
+import io
+import json
+import os
+import tarfile
 import typing as T
+import zipfile
 from pathlib import Path
 from unittest import mock
 
 import pytest
 from click.testing import CliRunner
 
-from crcmanip.cli import calc, cli, patch
+from crcmanip.checkpoint import get_checkpoint
+from crcmanip.cli import (
+    CRC_FACTORY,
+    backends,
+    calc,
+    check,
+    cli,
+    patch,
+    search,
+    serve,
+)
 
 
 @pytest.fixture(scope="module")
@@ -139,3 +154,385 @@ def test_patch_command_backup(src_file: Path, runner: CliRunner) -> None:
     assert result.output == ""
     assert src_file.read_bytes() == b"hello\x45\x7E\x34\x30"
     assert backup_file.read_bytes() == b"hello"
+
+
+def test_patch_command_charset(src_file: Path, runner: CliRunner) -> None:
+    result = runner.invoke(patch, [str(src_file), "DEADBEEF", "-c", "hex"])
+
+    assert result.exit_code == 0
+    assert result.output == ""
+    output = src_file.read_bytes()
+    assert output.startswith(b"hello")
+    assert set(output[5:]) <= set(b"0123456789abcdefABCDEF")
+    assert runner.invoke(calc, [str(src_file)]).output == "DEADBEEF\n"
+
+
+def test_patch_command_charset_unsolvable(
+    src_file: Path, runner: CliRunner
+) -> None:
+    result = runner.invoke(
+        patch, [str(src_file), "DEADBEEF", "-c", "hex", "-s", "2"]
+    )
+
+    assert result.exit_code == 1
+    assert "no patch satisfies the given constraints" in result.output
+    assert src_file.read_bytes() == b"hello"
+    assert list(src_file.parent.iterdir()) == [src_file]
+
+
+def test_patch_command_patch_size_without_charset(
+    src_file: Path, runner: CliRunner
+) -> None:
+    result = runner.invoke(patch, [str(src_file), "DEADBEEF", "-s", "8"])
+
+    assert result.exit_code == 2
+    assert src_file.read_bytes() == b"hello"
+
+
+def test_patch_command_charset_overwrite(
+    src_file: Path, runner: CliRunner
+) -> None:
+    src_file.write_text("hello world")
+
+    result = runner.invoke(
+        patch,
+        [str(src_file), "DEADBEEF", "-c", "printable", "-s", "9", "-O"],
+    )
+
+    assert result.exit_code == 0
+    output = src_file.read_bytes()
+    assert len(output) == 11
+    assert output.startswith(b"he")
+    assert all(0x20 <= char < 0x7F for char in output)
+    assert runner.invoke(calc, [str(src_file)]).output == "DEADBEEF\n"
+
+
+@pytest.mark.parametrize(
+    "extra_args,expected_output",
+    [
+        ([], b"hello\x45\x7E\x34\x30"),
+        (["-P", "1"], b"h\x54\x05\xD8\x8Aello"),
+        (["-O", "-P", "1"], b"h\x24\xDE\x4F\x97"),
+    ],
+)
+def test_patch_command_stream(
+    tmp_path: Path,
+    extra_args: T.List[str],
+    expected_output: bytes,
+    runner: CliRunner,
+) -> None:
+    dst_file = tmp_path / "output.txt"
+
+    result = runner.invoke(
+        patch,
+        ["-", "DEADBEEF", "-o", str(dst_file), *extra_args],
+        input=b"hello",
+    )
+
+    assert result.exit_code == 0
+    assert dst_file.read_bytes() == expected_output
+
+
+def test_patch_command_stream_stdout(runner: CliRunner) -> None:
+    result = runner.invoke(patch, ["-", "DEADBEEF"], input=b"hello")
+
+    assert result.exit_code == 0
+    assert result.stdout_bytes == b"hello\x45\x7E\x34\x30"
+
+
+def test_patch_command_stream_unseekable_output(runner: CliRunner) -> None:
+    read_fd, write_fd = os.pipe()
+    pipe_path = Path(f"/dev/fd/{write_fd}")
+    if not pipe_path.exists():
+        pytest.skip("/dev/fd is not available")
+    try:
+        result = runner.invoke(
+            patch,
+            ["-", "DEADBEEF", "-P", "2", "-o", str(pipe_path)],
+            input=b"hello",
+        )
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    assert result.exit_code == 2
+    assert "needs a seekable output" in result.output
+
+
+@pytest.mark.parametrize(
+    "extra_args", [["-b"], ["-O"], ["-P", "-1"], ["-O", "-P", "-1"]]
+)
+def test_patch_command_stream_invalid_args(
+    extra_args: T.List[str], runner: CliRunner
+) -> None:
+    result = runner.invoke(patch, ["-", "DEADBEEF", *extra_args])
+
+    assert result.exit_code == 2
+
+
+def test_serve_command(tmp_path: Path, runner: CliRunner) -> None:
+    socket_path = tmp_path / "crcmanip.sock"
+
+    with mock.patch("crcmanip.cli.serve_socket") as mock_serve, mock.patch(
+        "crcmanip.cli.disable_progressbars"
+    ) as mock_disable_progressbars:
+        result = runner.invoke(serve, [str(socket_path), "-j", "4"])
+
+    assert result.exit_code == 0
+    mock_disable_progressbars.assert_called_once()
+    mock_serve.assert_called_once_with(socket_path, CRC_FACTORY, jobs=4)
+
+
+def test_check_command(src_file: Path, runner: CliRunner) -> None:
+    manifest_path = src_file.parent / "test.sfv"
+    manifest_path.write_text("file.txt 3610A686\n")
+
+    with mock.patch("crcmanip.cli.disable_progressbars"):
+        result = runner.invoke(check, [str(manifest_path)])
+
+    assert result.exit_code == 0
+    assert result.output == "file.txt: OK\n"
+
+
+def test_check_command_failed(src_file: Path, runner: CliRunner) -> None:
+    manifest_path = src_file.parent / "test.ck"
+    manifest_path.write_text("3287646509 5 file.txt\n1 5 missing.txt\n")
+
+    with mock.patch("crcmanip.cli.disable_progressbars"):
+        result = runner.invoke(
+            check, ["-f", "cksum", "-j", "1", str(manifest_path)]
+        )
+
+    assert result.exit_code == 1
+    assert sorted(result.output.splitlines()) == [
+        "file.txt: OK",
+        "missing.txt: MISSING",
+    ]
+
+
+def test_check_command_directory(src_file: Path, runner: CliRunner) -> None:
+    (src_file.parent / "dir").mkdir()
+    manifest_path = src_file.parent / "test.sfv"
+    manifest_path.write_text("dir 00000000\nfile.txt 3610A686\n")
+
+    with mock.patch("crcmanip.cli.disable_progressbars"):
+        result = runner.invoke(check, [str(manifest_path)])
+
+    assert result.exit_code == 1
+    assert sorted(result.output.splitlines()) == [
+        "dir: ERROR",
+        "file.txt: OK",
+    ]
+
+
+def test_check_command_invalid_manifest(
+    src_file: Path, runner: CliRunner
+) -> None:
+    manifest_path = src_file.parent / "test.sfv"
+    manifest_path.write_text("file.txt 3610A686\nbogus\n")
+
+    with mock.patch("crcmanip.cli.disable_progressbars"):
+        result = runner.invoke(check, [str(manifest_path)])
+
+    assert result.exit_code == 1
+    assert "unrecognized manifest entry on line 2" in result.output
+
+
+def test_cli_backend(runner: CliRunner) -> None:
+    with mock.patch("crcmanip.cli.set_backend") as mock_set_backend:
+        result = runner.invoke(cli, ["--backend", "python", "backends"])
+
+    assert result.exit_code == 0
+    mock_set_backend.assert_called_once_with("python")
+
+
+def test_cli_backend_unavailable(runner: CliRunner) -> None:
+    with mock.patch("crcmanip.backends.load_backend", return_value=None):
+        result = runner.invoke(cli, ["--backend", "numpy", "backends"])
+
+    assert result.exit_code == 2
+    assert "CRC backend is not available: numpy" in result.output
+
+
+def test_backends_command(runner: CliRunner) -> None:
+    with mock.patch(
+        "crcmanip.cli.get_available_backends", return_value=["a", "b"]
+    ), mock.patch("crcmanip.cli.get_backend_name", return_value="b"):
+        result = runner.invoke(backends, [])
+
+    assert result.exit_code == 0
+    assert result.output == "  a\n* b\n"
+
+
+def test_calc_command_resume(src_file: Path, runner: CliRunner) -> None:
+    checkpoint_path = src_file.with_suffix(src_file.suffix + ".ckpt")
+
+    result = runner.invoke(calc, [str(src_file), "--resume"])
+
+    assert result.exit_code == 0
+    assert result.output == "3610A686\n"
+    assert not checkpoint_path.exists()
+
+
+def test_calc_command_resume_checkpoint(
+    src_file: Path, runner: CliRunner
+) -> None:
+    # pretend the first byte was hashed in a previous run
+    checkpoint = get_checkpoint(src_file, "CRC32")
+    checkpoint.save(
+        "checksum:0:5:4294967295:0",
+        1,
+        CRC_FACTORY["CRC32"].reset().update(b"H").raw_value,
+        1,
+    )
+
+    result = runner.invoke(calc, [str(src_file), "--resume"])
+
+    assert result.exit_code == 0
+    assert result.output == "F7D18982\n"  # checksum of "Hello"
+    assert not checkpoint.path.exists()
+
+
+def test_patch_command_resume(src_file: Path, runner: CliRunner) -> None:
+    checkpoint_path = src_file.with_suffix(src_file.suffix + ".ckpt")
+
+    result = runner.invoke(patch, [str(src_file), "DEADBEEF", "--resume"])
+
+    assert result.exit_code == 0
+    assert src_file.read_bytes() == b"hello\x45\x7E\x34\x30"
+    assert not checkpoint_path.exists()
+
+    result = runner.invoke(patch, ["-", "DEADBEEF", "--resume"])
+    assert result.exit_code == 2
+
+
+def test_search_command(src_file: Path, runner: CliRunner) -> None:
+    src_file.write_text("xxhelloyyhello")
+
+    result = runner.invoke(search, ["-w", "5", str(src_file), "3610A686"])
+
+    assert result.exit_code == 0
+    assert result.output == "2\n9\n"
+
+
+def test_search_command_quiet(src_file: Path, runner: CliRunner) -> None:
+    with mock.patch(
+        "crcmanip.cli.disable_progressbars"
+    ) as mock_disable_progressbars:
+        runner.invoke(search, ["-w", "5", str(src_file), "3610A686", "-q"])
+
+    mock_disable_progressbars.assert_called_once()
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_calc_command_range(
+    src_file: Path, runner: CliRunner, use_index: bool
+) -> None:
+    src_file.write_text("xxhelloyy")
+
+    result = runner.invoke(
+        calc,
+        [str(src_file), "--start", "2", "--end", "7"]
+        + (["--index"] if use_index else []),
+    )
+
+    assert result.exit_code == 0
+    assert result.output == "3610A686\n"
+    assert src_file.with_suffix(".txt.crcidx").exists() == use_index
+
+    result = runner.invoke(calc, [str(src_file), "--end", "10"])
+    assert result.exit_code == 2
+
+
+def test_patch_command_index(src_file: Path, runner: CliRunner) -> None:
+    result = runner.invoke(patch, [str(src_file), "DEADBEEF", "--index"])
+
+    assert result.exit_code == 0
+    assert src_file.read_bytes() == b"hello\x45\x7E\x34\x30"
+
+    result = runner.invoke(patch, ["-", "DEADBEEF", "--index"])
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("read_mode", ["buffered", "dontneed", "direct"])
+def test_calc_command_read_mode(
+    src_file: Path, runner: CliRunner, read_mode: str
+) -> None:
+    result = runner.invoke(calc, [str(src_file), "--read-mode", read_mode])
+
+    assert result.exit_code == 0
+    assert result.output == "3610A686\n"
+
+
+@pytest.mark.parametrize("queue_depth", ["0", "1", "4"])
+def test_calc_command_queue_depth(
+    src_file: Path, runner: CliRunner, queue_depth: str
+) -> None:
+    result = runner.invoke(calc, [str(src_file), "--queue-depth", queue_depth])
+
+    assert result.exit_code == 0
+    assert result.output == "3610A686\n"
+
+
+def test_calc_command_archive(tmp_path: Path, runner: CliRunner) -> None:
+    path = tmp_path / "archive.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("a.txt", b"hello")
+        archive.writestr("b.txt", b"world")
+
+    result = runner.invoke(calc, [str(path), "--archive"])
+    assert result.exit_code == 0
+    assert result.output == "a.txt 3610A686\nb.txt 3A771143\n"
+
+    path.write_bytes(path.read_bytes().replace(b"hello", b"jello", 1))
+    result = runner.invoke(calc, [str(path), "--archive"])
+    assert result.exit_code == 1
+    assert "a.txt: FAILED\n" in result.output
+
+    result = runner.invoke(calc, [str(path), "--archive", "--end", "1"])
+    assert result.exit_code == 2
+
+    (tmp_path / "a.txt").write_bytes(b"hello")
+    result = runner.invoke(calc, [str(tmp_path / "a.txt"), "--archive"])
+    assert result.exit_code == 2
+    assert "not a zip or tar archive" in result.output
+
+
+def test_calc_command_archive_truncated(
+    tmp_path: Path, runner: CliRunner
+) -> None:
+    path = tmp_path / "archive.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        info = tarfile.TarInfo("a.txt")
+        info.size = 100_000
+        archive.addfile(info, io.BytesIO(os.urandom(info.size)))
+    path.write_bytes(path.read_bytes()[: path.stat().st_size // 2])
+
+    result = runner.invoke(calc, [str(path), "--archive"])
+    assert result.exit_code == 1
+    assert "corrupt archive:" in result.output
+
+
+def test_calc_command_blocks(src_file: Path, runner: CliRunner) -> None:
+    src_file.write_text("hellohello!")
+
+    result = runner.invoke(calc, [str(src_file), "--block-size", "5"])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {
+        "checksum": "DDF79A2E",
+        "block_size": 5,
+        "blocks": ["3610A686", "3610A686", "9E6BFFD3"],
+    }
+
+    result = runner.invoke(
+        calc, [str(src_file), "-B", "5", "--block-format", "binary"]
+    )
+    assert result.exit_code == 0
+    assert result.stdout_bytes == bytes.fromhex(
+        "DDF79A2E" "3610A686" "3610A686" "9E6BFFD3"
+    )
+
+    result = runner.invoke(calc, [str(src_file), "-B", "5", "--archive"])
+    assert result.exit_code == 2
+    result = runner.invoke(calc, [str(src_file), "-B", "5", "--start", "1"])
+    assert result.exit_code == 2
@@ -1,3 +1,4 @@
+import copy
 import typing as T
 
 import pytest
@@ -46,6 +47,24 @@ def test_reset(any_crc: BaseCRC) -> None:
     assert any_crc.digest() == initial_checksum
 
 
+def test_copy(any_crc: BaseCRC) -> None:
+    any_crc.update(b"123")
+    clone = any_crc.copy()
+    assert type(clone) is type(any_crc)
+    assert clone.lookup_table is any_crc.lookup_table
+    assert clone.raw_value == any_crc.raw_value
+    assert clone.consumed == any_crc.consumed
+
+    clone.update(b"456")
+    assert clone.digest() == type(any_crc)().update(b"123456").digest()
+    assert any_crc.digest() == type(any_crc)().update(b"123").digest()
+    assert copy.copy(any_crc).digest() == any_crc.digest()
+
+
+def test_slots(any_crc: BaseCRC) -> None:
+    assert not hasattr(any_crc, "__dict__")
+
+
 @pytest.mark.parametrize(
     "crc_cls,test_string,expected_digest",
     [
@@ -61,3 +80,28 @@ def test_reverse_update(
 ) -> None:
     actual_digest = crc_cls().update_reverse(test_string).digest()
     assert actual_digest == expected_digest
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("count", [0, 1, 2, 7, 8, 100, 1025])
+@pytest.mark.parametrize("value", [0, 1, 0x1234, 0xDEADBEEF])
+def test_zeros_value(crc_cls: T.Type[BaseCRC], count: int, value: int) -> None:
+    crc = crc_cls()
+    value &= (1 << crc.num_bits) - 1
+    assert crc.get_next_zeros_value(count, value) == crc.get_next_value(
+        bytes(count), value
+    )
+    assert crc.get_prev_zeros_value(count, value) == crc.get_prev_value(
+        bytes(count), value
+    )
+
+
+def test_update_zeros(any_crc: BaseCRC) -> None:
+    expected_crc = any_crc.__class__().update(b"123" + bytes(100))
+    any_crc.update(b"123").update_zeros(100)
+    assert any_crc.raw_value == expected_crc.raw_value
+    assert any_crc.digest() == expected_crc.digest()
+
+    any_crc.update_zeros_reverse(100)
+    expected_crc.reset().update(b"123")
+    assert any_crc.raw_value == expected_crc.raw_value
@@ -0,0 +1,42 @@
+import typing as T
+
+import pytest
+
+from crcmanip import gf2
+
+
+@pytest.mark.parametrize(
+    "columns,target,expected_solution",
+    [
+        ([0b01, 0b10], 0b11, 0b11),
+        ([0b01, 0b11], 0b10, 0b11),
+        ([0b01, 0b01], 0b01, 0b01),
+        ([0b01, 0b01], 0b10, None),
+        ([], 0b00, 0b00),
+    ],
+)
+def test_solve(
+    columns: T.List[int], target: int, expected_solution: T.Optional[int]
+) -> None:
+    assert gf2.solve(columns, target) == expected_solution
+
+
+@pytest.mark.parametrize(
+    "charset,expected_dim",
+    [
+        (b"0123456789", 3),
+        (bytes(range(0x20, 0x7F)), 6),
+        (bytes(range(0x100)), 8),
+        (b"a", 0),
+    ],
+)
+def test_find_affine_subspaces(charset: bytes, expected_dim: int) -> None:
+    subspaces = gf2.find_affine_subspaces(charset)
+    assert subspaces
+    for base, basis in subspaces:
+        assert len(basis) == expected_dim
+        members = {base}
+        for vector in basis:
+            members |= {member ^ vector for member in members}
+        assert len(members) == 1 << expected_dim
+        assert members <= set(charset)
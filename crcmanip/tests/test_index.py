@@ -0,0 +1,85 @@
+import io
+import typing as T
+from pathlib import Path
+
+import pytest
+
+from crcmanip.algorithm import apply_patch, consume, consume_reverse
+from crcmanip.crc import BaseCRC
+from crcmanip.index import build_index, get_index, load_index
+
+TEST_STRING = b"hello123456789" * 50
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("interval", [1, 7, 64, 10000])
+def test_index_range(crc_cls: T.Type[BaseCRC], interval: int) -> None:
+    crc = crc_cls()
+    with io.BytesIO(TEST_STRING) as handle:
+        index = build_index(crc, handle, interval=interval, chunk_size=5)
+        assert len(index.states) == len(TEST_STRING) // interval + 1
+
+        for start_pos, end_pos in [(0, 0), (0, 700), (3, 80), (64, 128)]:
+            expected_crc = crc_cls()
+            consume(expected_crc, handle, start_pos, end_pos)
+            assert (
+                index.get_next_value(
+                    handle, start_pos, end_pos, crc.initial_xor
+                )
+                == expected_crc.raw_value
+            )
+
+            expected_crc.reset(raw_value=0x1234)
+            consume_reverse(expected_crc, handle, start_pos, end_pos)
+            assert (
+                index.get_prev_value(handle, start_pos, end_pos, 0x1234)
+                == expected_crc.raw_value
+            )
+
+        with pytest.raises(ValueError):
+            index.get_prefix_value(handle, len(TEST_STRING) + 1)
+
+
+def test_get_index(any_crc: BaseCRC, tmp_path: Path) -> None:
+    path = tmp_path / "file.bin"
+    path.write_bytes(TEST_STRING)
+    index_path = tmp_path / "file.bin.crcidx"
+
+    index = get_index(path, any_crc, "CRC32", interval=100)
+    assert index_path.exists()
+    identity = {
+        "algorithm": "CRC32",
+        "size": len(TEST_STRING),
+        "mtime_ns": path.stat().st_mtime_ns,
+    }
+
+    loaded_index = load_index(index_path, any_crc, identity)
+    assert loaded_index is not None
+    assert loaded_index.interval == 100
+    assert list(loaded_index.states) == list(index.states)
+
+    assert load_index(index_path, any_crc, {**identity, "size": 1}) is None
+    assert load_index(tmp_path / "missing", any_crc, identity) is None
+
+
+@pytest.mark.parametrize("overwrite", [False, True])
+@pytest.mark.parametrize("target_pos", [0, 5, 699, 700])
+def test_apply_patch_index(
+    any_crc: BaseCRC, overwrite: bool, target_pos: int
+) -> None:
+    with io.BytesIO(
+        TEST_STRING
+    ) as input_handle, io.BytesIO() as output_handle:
+        index = build_index(any_crc, input_handle, interval=64)
+        apply_patch(
+            any_crc,
+            0xDEADBEEF,
+            input_handle,
+            output_handle,
+            target_pos=target_pos,
+            overwrite=overwrite,
+            index=index,
+        )
+        result = output_handle.getvalue()
+
+    assert type(any_crc)().update(result).digest() == 0xDEADBEEF
@@ -0,0 +1,147 @@
+import typing as T
+from pathlib import Path
+
+import pytest
+
+from crcmanip.cli import CRC_FACTORY
+from crcmanip.manifest import (
+    STATUS_ERROR,
+    STATUS_FAILED,
+    STATUS_MISSING,
+    STATUS_OK,
+    InvalidManifestError,
+    ManifestEntry,
+    parse_manifest,
+    parse_manifest_line,
+    verify_manifest,
+)
+
+
+@pytest.mark.parametrize(
+    "line,manifest_format,expected_entry",
+    [
+        (
+            "3287646509 5 file.txt",
+            "auto",
+            ManifestEntry(
+                "file.txt", Path("dir/file.txt"), "CRC32POSIX", 3287646509, 5
+            ),
+        ),
+        (
+            "my file.txt 3610a686",
+            "auto",
+            ManifestEntry(
+                "my file.txt", Path("dir/my file.txt"), "CRC32", 0x3610A686
+            ),
+        ),
+        (
+            "video (12345678) [3610A686].mkv",
+            "auto",
+            ManifestEntry(
+                "video (12345678) [3610A686].mkv",
+                Path("dir/video (12345678) [3610A686].mkv"),
+                "CRC32",
+                0x3610A686,
+            ),
+        ),
+        ("3287646509 5 file.txt", "sfv", None),
+        ("file.txt 3610A686", "cksum", None),
+        ("file.txt 3610A686", "filename", None),
+        ("file.txt", "auto", None),
+    ],
+)
+def test_parse_manifest_line(
+    line: str,
+    manifest_format: str,
+    expected_entry: T.Optional[ManifestEntry],
+) -> None:
+    assert (
+        parse_manifest_line(line, Path("dir"), manifest_format)
+        == expected_entry
+    )
+
+
+def test_parse_manifest(tmp_path: Path) -> None:
+    manifest_path = tmp_path / "test.sfv"
+    manifest_path.write_text("; comment\n\nfile.txt 3610A686\r\n")
+
+    assert parse_manifest(manifest_path) == [
+        ManifestEntry("file.txt", tmp_path / "file.txt", "CRC32", 0x3610A686)
+    ]
+
+
+def test_parse_manifest_invalid(tmp_path: Path) -> None:
+    manifest_path = tmp_path / "test.sfv"
+    manifest_path.write_text("file.txt 3610A686\nfile.txt\n")
+
+    with pytest.raises(InvalidManifestError, match="line 2"):
+        parse_manifest(manifest_path)
+
+
+@pytest.mark.parametrize(
+    "entry,expected_status",
+    [
+        (ManifestEntry("", Path("file.txt"), "CRC32", 0x3610A686), STATUS_OK),
+        (ManifestEntry("", Path("file.txt"), "CRC32", 0), STATUS_FAILED),
+        (ManifestEntry("", Path("missing"), "CRC32", 0), STATUS_MISSING),
+        (
+            ManifestEntry("", Path("file.txt"), "CRC32POSIX", 3287646509, 5),
+            STATUS_OK,
+        ),
+        (
+            ManifestEntry("", Path("file.txt"), "CRC32POSIX", 3287646509, 6),
+            STATUS_FAILED,
+        ),
+    ],
+)
+def test_verify_manifest(
+    tmp_path: Path, entry: ManifestEntry, expected_status: str
+) -> None:
+    (tmp_path / "file.txt").write_text("hello")
+    entry = entry._replace(path=tmp_path / entry.path)
+
+    assert list(verify_manifest([entry], CRC_FACTORY)) == [
+        (entry, expected_status)
+    ]
+
+
+def test_verify_manifest_groups(tmp_path: Path) -> None:
+    (tmp_path / "file.txt").write_text("hello")
+    entries = [
+        ManifestEntry("a", tmp_path / "file.txt", "CRC32", 0x3610A686),
+        ManifestEntry("b", tmp_path / "file.txt", "CRC32", 0),
+        ManifestEntry("c", tmp_path / "file.txt", "CRC32POSIX", 3287646509),
+    ]
+
+    assert sorted(verify_manifest(entries, CRC_FACTORY, jobs=2)) == [
+        (entries[0], STATUS_OK),
+        (entries[1], STATUS_FAILED),
+        (entries[2], STATUS_OK),
+    ]
+
+
+def test_verify_manifest_unreadable(tmp_path: Path) -> None:
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "file.txt").write_text("hello")
+    entries = [
+        ManifestEntry("dir", tmp_path / "dir", "CRC32", 0),
+        ManifestEntry("file.txt", tmp_path / "file.txt", "CRC32", 0x3610A686),
+    ]
+
+    assert sorted(verify_manifest(entries, CRC_FACTORY)) == [
+        (entries[0], STATUS_ERROR),
+        (entries[1], STATUS_OK),
+    ]
+
+
+def test_verify_manifest_fail_fast(tmp_path: Path) -> None:
+    entries = [
+        ManifestEntry(str(num), tmp_path / str(num), "CRC32", 0)
+        for num in range(100)
+    ]
+
+    results = list(
+        verify_manifest(entries, CRC_FACTORY, jobs=1, fail_fast=True)
+    )
+    assert len(results) == 1
+    assert results[0][1] == STATUS_MISSING
@@ -0,0 +1,86 @@
+import io
+import typing as T
+
+import pytest
+
+from crcmanip.algorithm import InvalidPositionError, UnsolvablePatchError
+from crcmanip.crc import CRC16IBM, CRC16XMODEM, CRC32, CRC32POSIX
+from crcmanip.multipatch import (
+    PatchConstraint,
+    apply_multi_patch,
+    compute_multi_patch,
+)
+
+TEST_STRING = bytes(range(256)) * 4
+CONSTRAINTS = [
+    PatchConstraint(None, None, CRC32(), 0xDEADBEEF),
+    PatchConstraint(0, 100, CRC16IBM(), 0xBEEF),
+    PatchConstraint(100, 300, CRC32POSIX(), 0x12345678),
+    PatchConstraint(250, 400, CRC16XMODEM(), 0x1111),
+]
+POSITIONS = list(range(1, 7)) + list(range(120, 126)) + [350, 351, 500, 501]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 10000])
+def test_apply_multi_patch(chunk_size: int) -> None:
+    with io.BytesIO(
+        TEST_STRING
+    ) as input_handle, io.BytesIO() as output_handle:
+        apply_multi_patch(
+            input_handle,
+            output_handle,
+            CONSTRAINTS,
+            POSITIONS,
+            chunk_size=chunk_size,
+        )
+        result = output_handle.getvalue()
+
+    assert len(result) == len(TEST_STRING)
+    for constraint in CONSTRAINTS:
+        data = result[constraint.start_pos : constraint.end_pos]
+        assert (
+            type(constraint.crc)().update(data).digest()
+            == constraint.target_checksum
+        )
+    assert all(
+        result[pos] == TEST_STRING[pos]
+        for pos in range(len(TEST_STRING))
+        if pos not in POSITIONS
+    )
+
+
+def test_compute_multi_patch_positions() -> None:
+    with io.BytesIO(TEST_STRING) as handle:
+        patch = compute_multi_patch(handle, CONSTRAINTS, POSITIONS)
+    assert sorted(patch.keys()) == POSITIONS
+
+
+@pytest.mark.parametrize(
+    "constraints,positions",
+    [
+        ([PatchConstraint(0, 10, CRC32(), 0)], [20, 21, 22, 23]),
+        ([PatchConstraint(0, 10, CRC32(), 0)], [0, 1, 2]),
+    ],
+)
+def test_compute_multi_patch_unsolvable(
+    constraints: T.List[PatchConstraint], positions: T.List[int]
+) -> None:
+    with io.BytesIO(TEST_STRING) as handle:
+        with pytest.raises(UnsolvablePatchError):
+            compute_multi_patch(handle, constraints, positions)
+
+
+@pytest.mark.parametrize(
+    "constraints,positions",
+    [
+        ([PatchConstraint(0, 10, CRC32(), 0)], [len(TEST_STRING)]),
+        ([PatchConstraint(0, 10, CRC32(), 0)], [-1]),
+        ([PatchConstraint(0, len(TEST_STRING) + 1, CRC32(), 0)], [0]),
+    ],
+)
+def test_compute_multi_patch_invalid_position(
+    constraints: T.List[PatchConstraint], positions: T.List[int]
+) -> None:
+    with io.BytesIO(TEST_STRING) as handle:
+        with pytest.raises(InvalidPositionError):
+            compute_multi_patch(handle, constraints, positions)
@@ -0,0 +1,168 @@
+import errno
+import io
+import os
+import threading
+import typing as T
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from crcmanip.algorithm import consume, consume_reverse
+from crcmanip.crc import BaseCRC
+from crcmanip.reader import DIRECT_IO_ALIGNMENT, READ_MODES, ChunkReader
+
+TEST_STRING = bytes(range(256)) * 100
+
+
+@pytest.fixture
+def src_file(tmp_path: Path) -> Path:
+    ret = tmp_path / "file.bin"
+    ret.write_bytes(TEST_STRING)
+    return ret
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+@pytest.mark.parametrize(
+    "pos,size",
+    [
+        (0, 0),
+        (0, 1),
+        (1, 10),
+        (DIRECT_IO_ALIGNMENT - 1, 2),
+        (DIRECT_IO_ALIGNMENT, DIRECT_IO_ALIGNMENT),
+        (100, len(TEST_STRING)),
+        (len(TEST_STRING), 10),
+    ],
+)
+def test_read(src_file: Path, read_mode: str, pos: int, size: int) -> None:
+    with src_file.open("rb") as handle, ChunkReader(
+        handle, read_mode
+    ) as reader:
+        reader.prefetch(pos + size, size)
+        assert reader.read(pos, size) == TEST_STRING[pos : pos + size]
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_read_no_fileno(read_mode: str) -> None:
+    with io.BytesIO(TEST_STRING) as handle:
+        reader = ChunkReader(handle, read_mode)
+        assert reader.read_mode == "buffered"
+        assert reader.read(1, 3) == TEST_STRING[1:4]
+
+
+def test_read_direct_unsupported(src_file: Path) -> None:
+    with src_file.open("rb") as handle, ChunkReader(
+        handle, "direct"
+    ) as reader:
+        if reader.read_mode != "direct":
+            pytest.skip("O_DIRECT is not supported")
+        with mock.patch(
+            "os.preadv", side_effect=OSError(errno.EINVAL, "Invalid argument")
+        ):
+            assert reader.read(1, 3) == TEST_STRING[1:4]
+        assert reader.read_mode == "dontneed"
+        assert reader.orig_flags is None
+
+
+@pytest.mark.parametrize(
+    "max_read", [DIRECT_IO_ALIGNMENT, DIRECT_IO_ALIGNMENT + 100]
+)
+def test_read_direct_short_reads(src_file: Path, max_read: int) -> None:
+    preadv = os.preadv
+
+    def short_preadv(fd: int, buffers: T.List[memoryview], pos: int) -> int:
+        return min(preadv(fd, buffers, pos), max_read)
+
+    with src_file.open("rb") as handle, ChunkReader(
+        handle, "direct"
+    ) as reader:
+        if reader.read_mode != "direct":
+            pytest.skip("O_DIRECT is not supported")
+        with mock.patch("os.preadv", side_effect=short_preadv):
+            assert reader.read(1, len(TEST_STRING)) == TEST_STRING[1:]
+        assert reader.read_mode == "direct"
+
+
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_consume_read_mode(
+    any_crc: BaseCRC, src_file: Path, read_mode: str
+) -> None:
+    expected_crc = type(any_crc)().update(TEST_STRING[5:-5])
+    with src_file.open("rb") as handle:
+        consume(
+            any_crc, handle, 5, len(TEST_STRING) - 5, 1000, read_mode=read_mode
+        )
+        assert any_crc.raw_value == expected_crc.raw_value
+
+        consume_reverse(
+            any_crc, handle, 5, len(TEST_STRING) - 5, 1000, read_mode=read_mode
+        )
+        assert any_crc.raw_value == type(any_crc)().raw_value
+
+
+def test_close_restores_flags(src_file: Path) -> None:
+    fcntl = pytest.importorskip("fcntl")
+    with src_file.open("rb") as handle:
+        flags = fcntl.fcntl(handle.fileno(), fcntl.F_GETFL)
+        with ChunkReader(handle, "direct"):
+            pass
+        assert fcntl.fcntl(handle.fileno(), fcntl.F_GETFL) == flags
+        assert handle.read() == TEST_STRING
+
+
+@pytest.mark.parametrize("queue_depth", [0, 1, 2, 8])
+@pytest.mark.parametrize("read_mode", READ_MODES)
+def test_read_chunks(src_file: Path, queue_depth: int, read_mode: str) -> None:
+    chunks = [(pos, 1000) for pos in range(0, len(TEST_STRING), 1000)]
+    with src_file.open("rb") as handle, ChunkReader(
+        handle, read_mode
+    ) as reader:
+        assert list(reader.read_chunks(chunks, queue_depth)) == [
+            TEST_STRING[pos : pos + size] for pos, size in chunks
+        ]
+
+
+def test_read_chunks_error(src_file: Path) -> None:
+    with src_file.open("rb") as handle, ChunkReader(handle) as reader:
+        with mock.patch.object(reader, "read", side_effect=OSError("boom")):
+            with pytest.raises(OSError, match="boom"):
+                list(reader.read_chunks([(0, 10), (10, 10)], queue_depth=2))
+
+
+def test_read_chunks_close(src_file: Path) -> None:
+    chunks = [(pos, 10) for pos in range(0, len(TEST_STRING), 10)]
+    num_threads = threading.active_count()
+    with src_file.open("rb") as handle:
+        with ChunkReader(handle) as reader:
+            chunk_iter = reader.read_chunks(chunks, queue_depth=1)
+            assert next(chunk_iter) == TEST_STRING[:10]
+        assert reader.chunks is None
+        assert threading.active_count() == num_threads
+
+
+@pytest.mark.parametrize("queue_depth", [0, 1, 4])
+def test_consume_queue_depth(
+    any_crc: BaseCRC, src_file: Path, queue_depth: int
+) -> None:
+    expected_crc = type(any_crc)().update(TEST_STRING[5:-5])
+    with src_file.open("rb") as handle:
+        consume(
+            any_crc,
+            handle,
+            5,
+            len(TEST_STRING) - 5,
+            1000,
+            queue_depth=queue_depth,
+        )
+        assert any_crc.raw_value == expected_crc.raw_value
+
+        consume_reverse(
+            any_crc,
+            handle,
+            5,
+            len(TEST_STRING) - 5,
+            1000,
+            queue_depth=queue_depth,
+        )
+        assert any_crc.raw_value == type(any_crc)().raw_value
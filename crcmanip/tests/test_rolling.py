@@ -0,0 +1,66 @@
+import io
+import typing as T
+
+import pytest
+
+from crcmanip.crc import BaseCRC
+from crcmanip.rolling import create_rolling_table, find_windows
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("window_size", [1, 2, 9, 100])
+def test_create_rolling_table(
+    crc_cls: T.Type[BaseCRC], window_size: int
+) -> None:
+    crc = crc_cls()
+    out_table = create_rolling_table(crc_cls, window_size)
+    for num in [0, 1, 0x80, 0xAB, 0xFF]:
+        assert out_table[num] == crc.get_next_value(
+            bytes([num]) + bytes(window_size - 1), 0
+        )
+
+
+@pytest.mark.parametrize("crc_cls", BaseCRC.__subclasses__())
+@pytest.mark.parametrize("window_size", [1, 5, 9, 40])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+@pytest.mark.parametrize("start_pos,end_pos", [(None, None), (3, 80)])
+def test_find_windows(
+    crc_cls: T.Type[BaseCRC],
+    window_size: int,
+    chunk_size: int,
+    start_pos: T.Optional[int],
+    end_pos: T.Optional[int],
+) -> None:
+    test_string = b"hello123456789" * 10
+    start = start_pos or 0
+    end = end_pos or len(test_string)
+    targets = [
+        crc_cls().update(test_string[pos : pos + window_size]).digest()
+        for pos in [4, 50]
+    ]
+    expected_offsets = [
+        pos
+        for pos in range(start, end - window_size + 1)
+        if crc_cls().update(test_string[pos : pos + window_size]).digest()
+        in targets
+    ]
+
+    with io.BytesIO(test_string) as handle:
+        actual_offsets = list(
+            find_windows(
+                crc_cls(),
+                handle,
+                window_size,
+                targets,
+                start_pos=start_pos,
+                end_pos=end_pos,
+                chunk_size=chunk_size,
+            )
+        )
+
+    assert actual_offsets == expected_offsets
+
+
+def test_find_windows_short_input(any_crc: BaseCRC) -> None:
+    with io.BytesIO(b"123") as handle:
+        assert list(find_windows(any_crc, handle, 4, [0])) == []
@@ -0,0 +1,127 @@
+import json
+import socket
+import threading
+import typing as T
+from pathlib import Path
+
+import pytest
+
+from crcmanip.cli import CRC_FACTORY
+from crcmanip.server import Server, run_request, serve
+
+
+@pytest.fixture
+def src_file(tmp_path: Path) -> Path:
+    ret = tmp_path / "file.txt"
+    ret.write_text("hello")
+    return ret
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> T.Iterator[Path]:
+    ret = tmp_path / "crcmanip.sock"
+    started = threading.Event()
+    servers: T.List[Server] = []
+
+    def ready(server: Server) -> None:
+        servers.append(server)
+        started.set()
+
+    thread = threading.Thread(
+        target=serve, args=(ret, CRC_FACTORY), kwargs={"ready": ready}
+    )
+    thread.start()
+    started.wait()
+    yield ret
+    servers[0].shutdown()
+    thread.join()
+
+
+@pytest.mark.parametrize(
+    "request_,expected_response",
+    [
+        ({"id": 1, "command": "calc"}, {"id": 1, "result": "3610A686"}),
+        (
+            {"id": 2, "command": "calc", "algorithm": "CRC16IBM"},
+            {"id": 2, "result": "34D2"},
+        ),
+        (
+            {"id": 3, "command": "bogus"},
+            {"id": 3, "error": "unknown command: bogus"},
+        ),
+        (
+            {"id": 4, "command": "calc", "algorithm": "bogus"},
+            {"id": 4, "error": "unknown algorithm: bogus"},
+        ),
+        (
+            {"id": 5, "command": "patch", "checksum": "BEEF", "charset": "?"},
+            {"id": 5, "error": "unknown charset: ?"},
+        ),
+        (
+            {"id": 6, "command": "patch", "checksum": "BEEF", "patch_size": 8},
+            {"id": 6, "error": "patch_size needs a charset"},
+        ),
+    ],
+)
+def test_run_request(
+    src_file: Path,
+    request_: T.Dict[str, T.Any],
+    expected_response: T.Dict[str, T.Any],
+) -> None:
+    request_["path"] = str(src_file)
+    assert run_request(CRC_FACTORY, request_) == expected_response
+
+
+def test_run_request_patch(src_file: Path) -> None:
+    request_ = {"command": "patch", "path": str(src_file), "checksum": "BEEF"}
+
+    assert run_request(CRC_FACTORY, request_) == {
+        "id": None,
+        "result": str(src_file),
+    }
+    assert run_request(CRC_FACTORY, {**request_, "command": "calc"}) == {
+        "id": None,
+        "result": "0000BEEF",
+    }
+
+
+def test_run_request_missing_file(tmp_path: Path) -> None:
+    response = run_request(
+        CRC_FACTORY, {"command": "calc", "path": str(tmp_path / "missing")}
+    )
+    assert "error" in response
+
+
+def test_serve(src_file: Path, socket_path: Path) -> None:
+    requests = [
+        {"id": num, "command": "calc", "path": str(src_file)}
+        for num in range(20)
+    ]
+
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(str(socket_path))
+        with sock.makefile("rwb") as handle:
+            for request_ in requests:
+                handle.write(json.dumps(request_).encode() + b"\n")
+            handle.write(b"\n[]\n")
+            handle.flush()
+            sock.shutdown(socket.SHUT_WR)
+            responses = [json.loads(line) for line in handle]
+
+    assert {"id": None, "error": "request must be an object"} in responses
+    assert sorted(
+        (response for response in responses if response["id"] is not None),
+        key=lambda response: T.cast(int, response["id"]),
+    ) == [{"id": num, "result": "3610A686"} for num in range(20)]
+
+
+def test_serve_stale_socket(tmp_path: Path) -> None:
+    socket_path = tmp_path / "crcmanip.sock"
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(socket_path))
+
+    def ready(server: Server) -> None:
+        threading.Thread(target=server.shutdown).start()
+
+    serve(socket_path, CRC_FACTORY, jobs=1, ready=ready)
+    assert not socket_path.exists()